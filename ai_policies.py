@@ -0,0 +1,214 @@
+# ai_policies.py
+# Enemy policies for the headless battle engine. Each policy picks one
+# Action for the side to move; the tournament runner compares them.
+
+import random
+
+from battle_sim import Action
+from combat_rules import manhattan, expected_damage, kill_chance, expected_healing
+from threat_map import ThreatMap
+
+
+class Policy:
+    """Base class: subclasses implement choose(battle, side) -> Action."""
+    name = 'base'
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def choose(self, battle, side):
+        raise NotImplementedError
+
+
+def _step_toward(battle, i, side, target_pos):
+    """One orthogonal step toward target_pos, as CombatScreen.enemy_turn moves."""
+    pos = battle.pos[i]
+    (ex, ey), (px, py) = pos, target_pos
+    dx, dy = px - ex, py - ey
+    if abs(dx) > abs(dy):
+        step = (ex + (1 if dx > 0 else -1), ey)
+    else:
+        step = (ex, ey + (1 if dy > 0 else -1))
+    if not (0 <= step[0] < battle.grid_size and 0 <= step[1] < battle.grid_size):
+        return Action(i, pos, None)
+    blocker = battle.unit_at(step)
+    if blocker is None:
+        return Action(i, step, None)
+    if battle.side[blocker] == side:
+        final_pos = battle.find_empty_tile_near(step)
+        if final_pos is not None:
+            return Action(i, final_pos, None)
+    return Action(i, pos, None)
+
+
+class GreedyPolicy(Policy):
+    """The original enemy_turn: first unit, closest target, attack if adjacent, else step."""
+    name = 'greedy'
+
+    def choose(self, battle, side):
+        i = battle.pending(side)[0]
+        pos = battle.pos[i]
+        unit = battle.units[i]
+
+        # Find closest opposing unit
+        closest, closest_distance = None, float('inf')
+        for j in battle.alive(1 - side):
+            distance = manhattan(pos, battle.pos[j])
+            if distance < closest_distance:
+                closest, closest_distance = j, distance
+
+        if closest is None:
+            return Action(i, pos, None)
+        if closest_distance == 1:
+            if unit.unit_type == 'Cleric':
+                return Action(i, pos, _most_wounded(battle, battle.targets(i, pos)))
+            return Action(i, pos, closest)
+
+        # Move one step toward the closest opposing unit
+        return _step_toward(battle, i, side, battle.pos[closest])
+
+
+class ThreatPolicy(GreedyPolicy):
+    """CombatScreen.enemy_turn: threat-map target, move into range and attack, else step toward it."""
+    name = 'threat'
+
+    def choose(self, battle, side):
+        i = battle.pending(side)[0]
+        if battle.units[i].unit_type == 'Cleric':
+            return super().choose(battle, side)
+        friends_idx = battle.alive(side)
+        foes_idx = battle.alive(1 - side)
+        threat_map = ThreatMap(
+            battle.grid_size,
+            [(battle.units[k], battle.pos[k]) for k in friends_idx],
+            [(battle.units[k], battle.pos[k], battle.hp[k]) for k in foes_idx],
+        )
+        target, attack_tile = threat_map.best_target(friends_idx.index(i))
+        if target is None:
+            return Action(i, battle.pos[i], None)
+        if attack_tile is not None:
+            return Action(i, attack_tile, foes_idx[target])
+        return _step_toward(battle, i, side, battle.pos[foes_idx[target]])
+
+
+class RandomPolicy(Policy):
+    """Uniformly random legal action; a floor for the rating table."""
+    name = 'random'
+
+    def choose(self, battle, side):
+        return self.rng.choice(battle.legal_actions(side))
+
+
+def score_action(battle, action, side, enemy_tiles=None):
+    """Immediate heuristic value of an action for `side`."""
+    i, tile, j = action
+    unit = battle.units[i]
+    score = 0.0
+    if j is not None:
+        target = battle.units[j]
+        if battle.side[j] == side:
+            score += expected_healing(unit, target.hp - battle.hp[j])
+        else:
+            score += expected_damage(unit, target)
+            score += 3.0 * kill_chance(unit, target, battle.hp[j])
+    # Prefer closing in on the nearest opposing unit when nothing else differs
+    if enemy_tiles is None:
+        enemy_tiles = [battle.pos[e] for e in battle.alive(1 - side)]
+    if enemy_tiles:
+        score -= 0.01 * min(manhattan(tile, e) for e in enemy_tiles)
+    return score
+
+
+def ranked_actions(battle, side):
+    """Legal actions for `side`, best immediate score first."""
+    enemy_tiles = [battle.pos[e] for e in battle.alive(1 - side)]
+    actions = battle.legal_actions(side)
+    actions.sort(key=lambda a: score_action(battle, a, side, enemy_tiles), reverse=True)
+    return actions
+
+
+class FocusFirePolicy(Policy):
+    """Pick the single action with the best immediate damage/kill value."""
+    name = 'focus'
+
+    def choose(self, battle, side):
+        return ranked_actions(battle, side)[0]
+
+
+def evaluate(battle, side):
+    """Material balance from `side`'s point of view: HP plus a bonus per living unit."""
+    total = 0.0
+    for k, unit in enumerate(battle.units):
+        hp = battle.hp[k]
+        if hp <= 0:
+            continue
+        value = hp + 3.0
+        total += value if battle.side[k] == side else -value
+    return total
+
+
+def expected_outcome(battle, action):
+    """Apply an action with mean dice results instead of rolling."""
+    i, tile, j = action
+    after = battle.clone()
+    after.pos[i] = tile
+    if j is not None:
+        unit, target = battle.units[i], battle.units[j]
+        if battle.side[j] == battle.side[i]:
+            after.hp[j] += expected_healing(unit, target.hp - battle.hp[j])
+        elif kill_chance(unit, target, battle.hp[j]) >= 0.5:
+            after.hp[j] = 0
+        else:
+            after.hp[j] -= expected_damage(unit, target)
+    after.activated.add(i)
+    after._pass_activation()
+    return after
+
+
+class LookaheadPolicy(Policy):
+    """Two-ply search on expected outcomes: our action, then the opponent's best reply."""
+    name = 'search'
+
+    def __init__(self, seed=None, width=8):
+        super().__init__(seed)
+        self.width = width
+
+    def choose(self, battle, side):
+        actions = ranked_actions(battle, side)
+        best, best_value = actions[0], float('-inf')
+        for action in actions[:self.width]:
+            after = expected_outcome(battle, action)
+            value = self._worst_reply(after, side)
+            if value > best_value:
+                best, best_value = action, value
+        return best
+
+    def _worst_reply(self, battle, side):
+        if battle.is_over() or battle.to_move == side:
+            return evaluate(battle, side)
+        opponent = battle.to_move
+        replies = ranked_actions(battle, opponent)
+        return min(evaluate(expected_outcome(battle, r), side) for r in replies[:self.width])
+
+
+def _most_wounded(battle, candidates):
+    wounded = [j for j in candidates if battle.hp[j] < battle.units[j].hp]
+    if not wounded:
+        return None
+    return min(wounded, key=lambda j: battle.hp[j] - battle.units[j].hp)
+
+
+POLICIES = {
+    GreedyPolicy.name: GreedyPolicy,
+    ThreatPolicy.name: ThreatPolicy,
+    FocusFirePolicy.name: FocusFirePolicy,
+    LookaheadPolicy.name: LookaheadPolicy,
+    RandomPolicy.name: RandomPolicy,
+}
+
+
+def make_policy(name, seed=None):
+    """Instantiate a registered policy by name."""
+    if name not in POLICIES:
+        raise ValueError(f"Unknown policy '{name}'. Choose from: {', '.join(sorted(POLICIES))}")
+    return POLICIES[name](seed=seed)
@@ -0,0 +1,208 @@
+# asset_pipeline.py
+# Texture atlases, background preloading and a per-screen texture cache.
+#
+# Packing (build time, needs Pillow):
+#     python asset_pipeline.py
+# packs the images under assets/images into Kivy atlases in assets/atlas, one
+# atlas per subdirectory (top-level images go into the "images" atlas), and
+# writes assets/atlas/index.json mapping each image name to its atlas. Images
+# larger than MAX_ATLAS_IMAGE on a side (backgrounds) stay standalone files.
+#
+# Loading (run time): images are named by their path under assets/images
+# without the extension, e.g. 'village_bg' or 'units/warrior'. TextureCache
+# decodes them with kivy.loader.Loader, whose worker threads do the PNG
+# decoding off the main thread, and hands out textures per screen. Images
+# that live in an atlas share one page texture, so a screen drawing many of
+# them binds one GPU texture instead of one per image. The cache keeps the
+# textures of the most recently used screens and drops the rest.
+
+import json
+import os
+from collections import OrderedDict
+
+IMAGE_DIR = os.path.join('assets', 'images')
+ATLAS_DIR = os.path.join('assets', 'atlas')
+ATLAS_INDEX = os.path.join(ATLAS_DIR, 'index.json')
+ATLAS_SIZE = 2048        # Atlas page size in pixels
+MAX_ATLAS_IMAGE = 512    # Larger images are not worth a page slot
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg')
+ROOT_ATLAS = 'images'    # Atlas for images directly under IMAGE_DIR
+
+# Images each screen shows, preloaded before the screen needs them
+SCREEN_ASSETS = {
+    'landing': ('village_bg',),
+}
+
+
+def _image_files(image_dir):
+    for folder, _, files in os.walk(image_dir):
+        for filename in sorted(files):
+            if filename.lower().endswith(IMAGE_EXTS):
+                path = os.path.join(folder, filename)
+                name = os.path.splitext(os.path.relpath(path, image_dir))[0].replace(os.sep, '/')
+                yield name, path
+
+
+def pack_atlases(image_dir=IMAGE_DIR, atlas_dir=ATLAS_DIR, size=ATLAS_SIZE, max_image=MAX_ATLAS_IMAGE):
+    """
+    Pack images into one atlas per subdirectory and write the atlas index.
+
+    :return: the index, {image name: [atlas name, atlas id]}
+    """
+    try:
+        from PIL import Image as PILImage
+    except ImportError:
+        raise ImportError("Packing atlases needs Pillow (pip install pillow)")
+    from kivy.atlas import Atlas
+
+    groups = {}
+    for name, path in _image_files(image_dir):
+        with PILImage.open(path) as img:
+            width, height = img.size
+        if width > max_image or height > max_image:
+            continue  # Stays a standalone file
+        atlas = name.rsplit('/', 1)[0].replace('/', '_') if '/' in name else ROOT_ATLAS
+        groups.setdefault(atlas, []).append((name, path))
+
+    os.makedirs(atlas_dir, exist_ok=True)
+    index = {}
+    for atlas, images in sorted(groups.items()):
+        ids = [os.path.splitext(os.path.basename(path))[0] for _, path in images]
+        if len(set(ids)) != len(ids):
+            raise ValueError(f"Atlas {atlas!r} would hold two images with the same file name")
+        Atlas.create(os.path.join(atlas_dir, atlas), [path for _, path in images], size)
+        for (name, _), atlas_id in zip(images, ids):
+            index[name] = [atlas, atlas_id]
+
+    tmp_name = os.path.join(atlas_dir, 'index.json.tmp')
+    with open(tmp_name, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    os.replace(tmp_name, os.path.join(atlas_dir, 'index.json'))
+    return index
+
+
+def _load_index(path=ATLAS_INDEX):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}  # Not packed: every image loads from its own file
+
+
+def image_path(name, image_dir=IMAGE_DIR):
+    """Standalone file for an image name."""
+    base = os.path.join(image_dir, *name.split('/'))
+    for ext in IMAGE_EXTS:
+        if os.path.exists(base + ext):
+            return base + ext
+    return base + IMAGE_EXTS[0]
+
+
+class TextureCache:
+    def __init__(self, max_screens=3, index_path=ATLAS_INDEX, atlas_dir=ATLAS_DIR):
+        """
+        :param max_screens: how many screens' textures stay cached; the least
+            recently used screen's textures are dropped beyond that
+        """
+        self.max_screens = max_screens
+        self.atlas_dir = atlas_dir
+        self.index = _load_index(index_path)
+        self._screens = OrderedDict()   # screen -> {image name: texture}, least recently used first
+        self._waiting = {}              # file being loaded -> [callback(texture of the file)]
+        self._regions = {}              # atlas name -> {atlas id: (page file, (x, y, w, h))}
+
+    def get(self, screen, name):
+        """Cached texture of an image for a screen, or None if it is not loaded yet."""
+        textures = self._touch(screen)
+        return textures.get(name)
+
+    def request(self, screen, name, callback):
+        """
+        Call callback(texture) once the image is loaded: right away if cached,
+        otherwise after a background decode.
+        """
+        textures = self._touch(screen)
+        texture = textures.get(name)
+        if texture is not None:
+            callback(texture)
+            return
+        for other in self._screens.values():
+            texture = other.get(name)
+            if texture is not None:  # Another cached screen already has it
+                textures[name] = texture
+                callback(texture)
+                return
+
+        def loaded(texture):
+            if screen in self._screens:
+                self._screens[screen][name] = texture
+            callback(texture)
+        self._load(name, loaded)
+
+    def preload(self, screen, names=None):
+        """Start loading a screen's images (default: its SCREEN_ASSETS) in the background."""
+        for name in names if names is not None else SCREEN_ASSETS.get(screen, ()):
+            self.request(screen, name, lambda texture: None)
+
+    def release(self, screen):
+        """Drop a screen's textures from the cache."""
+        self._screens.pop(screen, None)
+
+    def _touch(self, screen):
+        textures = self._screens.get(screen)
+        if textures is None:
+            textures = self._screens[screen] = {}
+        self._screens.move_to_end(screen)
+        while len(self._screens) > self.max_screens:
+            self._screens.popitem(last=False)
+        return textures
+
+    def _load(self, name, callback):
+        entry = self.index.get(name)
+        if entry is None:
+            self._load_file(image_path(name), callback)
+            return
+        atlas, atlas_id = entry
+        page, region = self._atlas_regions(atlas)[atlas_id]
+        self._load_file(page, lambda texture: callback(texture.get_region(*region)))
+
+    def _atlas_regions(self, atlas):
+        regions = self._regions.get(atlas)
+        if regions is None:
+            with open(os.path.join(self.atlas_dir, atlas + '.atlas'), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            regions = self._regions[atlas] = {
+                atlas_id: (os.path.join(self.atlas_dir, page), tuple(coords))
+                for page, ids in meta.items() for atlas_id, coords in ids.items()
+            }
+        return regions
+
+    def _load_file(self, path, callback):
+        # One decode per file, however many images and screens are waiting on it
+        waiting = self._waiting.get(path)
+        if waiting is not None:
+            waiting.append(callback)
+            return
+        waiting = self._waiting[path] = [callback]
+        from kivy.loader import Loader
+        proxy = Loader.image(path)
+
+        def done(*args):
+            if proxy.image.texture is None:
+                return  # Still the loading placeholder
+            del self._waiting[path]
+            for waiter in waiting:
+                waiter(proxy.image.texture)
+        if proxy.loaded:
+            done()
+        else:
+            proxy.bind(on_load=done)
+
+
+# Texture cache shared by all screens
+texture_cache = TextureCache()
+
+
+if __name__ == '__main__':
+    packed = pack_atlases()
+    print(f"Packed {len(packed)} images into {len(set(a for a, _ in packed.values()))} atlases in {ATLAS_DIR}")
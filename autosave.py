@@ -0,0 +1,87 @@
+# autosave.py
+# Write-behind saver: coalesces bursts of save requests and writes the latest
+# payload on a background thread so the UI thread never waits on disk I/O.
+
+import threading
+import time
+
+
+class WriteBehindSaver:
+    def __init__(self, write, delay=0.5):
+        """
+        :param write: callable taking one payload; runs on the saver thread
+        :param delay: seconds of quiet after the last request before writing.
+            Requests arriving inside the window replace the pending payload,
+            so ten rapid clicks cost one write.
+        """
+        self._write = write
+        self.delay = delay
+        self._cond = threading.Condition()
+        self._pending = None
+        self._has_pending = False
+        self._due = 0.0
+        self._writing = False
+        self._thread = None
+
+    def schedule(self, payload):
+        """Queue payload for writing, replacing anything still pending."""
+        with self._cond:
+            self._pending = payload
+            self._has_pending = True
+            self._due = time.monotonic() + self.delay
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='autosave', daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def cancel(self):
+        """Drop any pending payload (e.g. after an explicit synchronous save)."""
+        with self._cond:
+            self._pending = None
+            self._has_pending = False
+
+    def flush(self):
+        """Write any pending payload now and wait for in-flight writes to finish."""
+        with self._cond:
+            while self._writing:
+                self._cond.wait()
+            payload = self._take()
+            if payload is None:
+                return
+        self._write_out(payload)
+
+    @property
+    def pending(self):
+        return self._has_pending or self._writing
+
+    def _take(self):
+        # Caller holds the condition
+        if not self._has_pending:
+            return None
+        payload = self._pending
+        self._pending = None
+        self._has_pending = False
+        self._writing = True
+        return payload
+
+    def _write_out(self, payload):
+        try:
+            self._write(payload)
+        except Exception as e:
+            print(f"Autosave failed: {e}")
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._has_pending or self._writing:
+                    self._cond.wait()
+                remaining = self._due - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                payload = self._take()
+            self._write_out(payload)
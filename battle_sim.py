@@ -0,0 +1,231 @@
+# battle_sim.py
+# Headless battle engine. Plays the same rules as CombatScreen (alternating
+# activations, move-then-act, dice combat, Cleric healing) without Kivy so AI
+# policies can be pitted against each other from the command line.
+
+import random
+from collections import namedtuple
+
+from combat_rules import resolve_attack, roll_dice, manhattan
+
+GRID_SIZE = 5
+MAX_ROUNDS = 20
+
+# Same deployment CombatScreen uses for the player; the other side gets the
+# point-mirrored tiles so neither side starts with a positional edge.
+SOUTH_POSITIONS = [(4, 1), (4, 2), (4, 3), (3, 2)]
+
+
+def mirror(pos, grid_size=GRID_SIZE):
+    """Point-mirror a tile through the centre of the board."""
+    return (grid_size - 1 - pos[0], grid_size - 1 - pos[1])
+
+
+NORTH_POSITIONS = [mirror(p) for p in SOUTH_POSITIONS]
+
+# One activation: which unit (index into Battle.units), where it ends its
+# move, and which unit it attacks/heals (None to pass the action phase).
+Action = namedtuple('Action', 'unit move_to target')
+
+
+class Battle:
+    def __init__(self, armies, positions=None, grid_size=GRID_SIZE, max_rounds=MAX_ROUNDS, rng=None):
+        """
+        Headless battle between two sides.
+
+        :param armies: (side_0_units, side_1_units) lists of Unit objects.
+            Units are only read; combat HP lives on the battle.
+        :param positions: optional (side_0_tiles, side_1_tiles); defaults to
+            SOUTH_POSITIONS / NORTH_POSITIONS.
+        :param rng: random.Random used for every dice roll.
+        """
+        if positions is None:
+            positions = (SOUTH_POSITIONS, NORTH_POSITIONS)
+        self.grid_size = grid_size
+        self.max_rounds = max_rounds
+        self.rng = rng if rng is not None else random.Random()
+
+        self.units = []   # Unit objects, shared and never mutated
+        self.side = []    # 0 or 1 per unit
+        self.pos = []     # (row, col) per unit
+        self.hp = []      # Current HP per unit
+        for side, (army, tiles) in enumerate(zip(armies, positions)):
+            for unit, tile in zip(army, tiles):
+                self.units.append(unit)
+                self.side.append(side)
+                self.pos.append(tile)
+                self.hp.append(unit.hp)
+
+        self.activated = set()   # Unit indices that already acted this round
+        self.to_move = 0         # Side 0 opens every round, like the player
+        self.round_number = 1
+        self.pulse = [0, 0]
+
+    def clone(self):
+        """Copy the mutable combat state; Unit objects are shared."""
+        other = Battle.__new__(Battle)
+        other.grid_size = self.grid_size
+        other.max_rounds = self.max_rounds
+        other.rng = self.rng
+        other.units = self.units
+        other.side = self.side
+        other.pos = list(self.pos)
+        other.hp = list(self.hp)
+        other.activated = set(self.activated)
+        other.to_move = self.to_move
+        other.round_number = self.round_number
+        other.pulse = list(self.pulse)
+        return other
+
+    # --- Queries ---
+    def is_alive(self, i):
+        return self.hp[i] > 0
+
+    def alive(self, side):
+        return [i for i in range(len(self.units)) if self.side[i] == side and self.hp[i] > 0]
+
+    def pending(self, side):
+        """Living units of `side` that have not activated this round."""
+        return [i for i in self.alive(side) if i not in self.activated]
+
+    def unit_at(self, pos):
+        for i, p in enumerate(self.pos):
+            if p == pos and self.hp[i] > 0:
+                return i
+        return None
+
+    def occupied(self):
+        return {self.pos[i]: i for i in range(len(self.units)) if self.hp[i] > 0}
+
+    def winner(self):
+        """0 or 1 when a side is wiped out, None while both still stand."""
+        if not self.alive(1):
+            return 0
+        if not self.alive(0):
+            return 1
+        return None
+
+    def is_over(self):
+        return self.winner() is not None or self.round_number > self.max_rounds
+
+    def move_tiles(self, i):
+        """Tiles unit i can end its move on, including staying put."""
+        start = self.pos[i]
+        side = self.side[i]
+        board = self.occupied()
+        seen = {start}
+        frontier = [start]
+        for _ in range(self.units[i].mov):
+            nxt = []
+            for x, y in frontier:
+                for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                    tile = (x + dx, y + dy)
+                    if tile in seen or not (0 <= tile[0] < self.grid_size and 0 <= tile[1] < self.grid_size):
+                        continue
+                    other = board.get(tile)
+                    if other is not None and self.side[other] != side:
+                        continue  # Enemies block movement
+                    seen.add(tile)
+                    nxt.append(tile)
+            frontier = nxt
+        # Friendly units can be passed through but not shared
+        return [t for t in seen if t == start or t not in board]
+
+    def targets(self, i, from_pos=None):
+        """Units that unit i could attack (or heal, for Clerics) from from_pos."""
+        if from_pos is None:
+            from_pos = self.pos[i]
+        rng = self.units[i].rng
+        if self.units[i].unit_type == 'Cleric':
+            wanted = self.side[i]
+        else:
+            wanted = 1 - self.side[i]
+        return [j for j in self.alive(wanted)
+                if j != i and 0 < manhattan(from_pos, self.pos[j]) <= rng]
+
+    def legal_actions(self, side=None):
+        if side is None:
+            side = self.to_move
+        actions = []
+        foes = self.alive(1 - side)
+        friends = self.alive(side)
+        for i in self.pending(side):
+            unit = self.units[i]
+            candidates = friends if unit.unit_type == 'Cleric' else foes
+            for tile in self.move_tiles(i):
+                actions.append(Action(i, tile, None))
+                for j in candidates:
+                    if j != i and 0 < manhattan(tile, self.pos[j]) <= unit.rng:
+                        actions.append(Action(i, tile, j))
+        return actions
+
+    def find_empty_tile_near(self, target_pos, max_distance=3):
+        """Same search CombatScreen.find_empty_tile_near performs."""
+        board = self.occupied()
+        if target_pos not in board:
+            return target_pos
+        x0, y0 = target_pos
+        for distance in range(1, max_distance + 1):
+            for dx in range(-distance, distance + 1):
+                for dy in range(-distance, distance + 1):
+                    if abs(dx) + abs(dy) == distance:
+                        x, y = x0 + dx, y0 + dy
+                        if 0 <= x < self.grid_size and 0 <= y < self.grid_size and (x, y) not in board:
+                            return (x, y)
+        return None
+
+    # --- Mutation ---
+    def apply(self, action):
+        """Play one activation and hand the turn over like CombatScreen.pass_activation."""
+        i = action.unit
+        self.pos[i] = action.move_to
+        if action.target is not None:
+            j = action.target
+            unit = self.units[i]
+            if unit.unit_type == 'Cleric':
+                dice = roll_dice(unit.atk, unit, self.rng)
+                heal = dice.count('Shield')
+                self.hp[j] = min(self.units[j].hp, self.hp[j] + heal)
+                self.pulse[self.side[i]] += dice.count('Pulse')
+            else:
+                atk_dice, def_dice, damage = resolve_attack(unit, self.units[j], self.rng)
+                self.hp[j] -= damage
+                self.pulse[self.side[i]] += atk_dice.count('Pulse')
+                self.pulse[self.side[j]] += def_dice.count('Pulse')
+        self.activated.add(i)
+        self._pass_activation()
+
+    def _pass_activation(self):
+        if self.winner() is not None:
+            return
+        other = 1 - self.to_move
+        if self.pending(other):
+            self.to_move = other
+        elif not self.pending(self.to_move):
+            # Both sides finished: new round, side 0 opens again
+            self.round_number += 1
+            self.activated.clear()
+            self.to_move = 0
+            if not self.pending(0):
+                self.to_move = 1
+
+
+def play(battle, policies, clock=None, timings=None):
+    """
+    Run a battle to completion.
+
+    :param policies: (side_0_policy, side_1_policy)
+    :param clock: optional zero-argument timer (e.g. time.perf_counter);
+        when given, every decision is timed into timings[side].
+    :return: 0 or 1 for the winning side, None for a draw at the round cap.
+    """
+    while not battle.is_over():
+        side = battle.to_move
+        if clock is not None:
+            start = clock()
+            action = policies[side].choose(battle, side)
+            timings[side].append(clock() - start)
+        else:
+            action = policies[side].choose(battle, side)
+        battle.apply(action)
+    return battle.winner()
@@ -0,0 +1,170 @@
+# battle_snapshot.py
+# Compact, cheaply cloned battle state for AI search and "what-if" previews.
+# The combat screen takes one when a unit's activation starts, so Cancel can
+# take back a move the unit made.
+#
+# Everything that never changes during a battle (names, stat lines, dice) is
+# gathered once into a tuple of UnitInfo records that every clone shares.
+# The mutable combat fields are held in immutable containers (tuples, an int
+# bitmask for activations), so clone() only copies references and a write
+# replaces just the one field it touches: copy-on-write without bookkeeping.
+
+from collections import namedtuple
+
+# Static per-unit data shared by every snapshot of the same battle.
+UnitInfo = namedtuple('UnitInfo', 'name unit_type hp atk def_ mov rng die_faces')
+
+PLAYER, ENEMY = 0, 1
+
+
+def unit_info(unit):
+    return UnitInfo(unit.name, unit.unit_type, unit.hp, unit.atk, unit.def_,
+                    unit.mov, unit.rng, tuple(unit.die_faces))
+
+
+class BattleSnapshot:
+    __slots__ = ('units', 'refs', 'side', 'pos', 'hp', 'activated',
+                 'pulse', 'round_number', 'to_move')
+
+    def __init__(self, units, refs, side, pos, hp, activated=0, pulse=(0, 0), round_number=1, to_move=PLAYER):
+        """
+        :param units: tuple of UnitInfo (shared between clones)
+        :param refs: tuple of the original Unit objects, for restoring
+        :param side: tuple of PLAYER/ENEMY per unit (shared between clones)
+        :param pos: tuple of (row, col) or None for units off the board
+        :param hp: tuple of current HP per unit
+        :param activated: bitmask of units that acted this round
+        :param pulse: (player_pulse, enemy_pulse)
+        """
+        self.units = units
+        self.refs = refs
+        self.side = side
+        self.pos = pos
+        self.hp = hp
+        self.activated = activated
+        self.pulse = pulse
+        self.round_number = round_number
+        self.to_move = to_move
+
+    @classmethod
+    def from_combat_screen(cls, screen):
+        """Capture the live state of a CombatScreen."""
+        refs = tuple(screen.player_units) + tuple(screen.enemy_units)
+        side = (PLAYER,) * len(screen.player_units) + (ENEMY,) * len(screen.enemy_units)
+        activated = 0
+        for i, unit in enumerate(refs):
+            done = screen.activated_player_units if side[i] == PLAYER else screen.activated_enemy_units
+            if unit in done:
+                activated |= 1 << i
+        return cls(
+            units=tuple(unit_info(u) for u in refs),
+            refs=refs,
+            side=side,
+            pos=tuple((screen.player_positions if side[i] == PLAYER else screen.enemy_positions).get(u)
+                      for i, u in enumerate(refs)),
+            hp=tuple(u.current_hp for u in refs),
+            activated=activated,
+            pulse=(screen.player_pulse, screen.enemy_pulse),
+            round_number=screen.round_number,
+            to_move=PLAYER if screen.active_side == "player" else ENEMY,
+        )
+
+    @classmethod
+    def from_battle(cls, battle):
+        """Capture a headless battle_sim.Battle."""
+        activated = 0
+        for i in battle.activated:
+            activated |= 1 << i
+        return cls(
+            units=tuple(unit_info(u) for u in battle.units),
+            refs=tuple(battle.units),
+            side=tuple(battle.side),
+            pos=tuple(battle.pos),
+            hp=tuple(battle.hp),
+            activated=activated,
+            pulse=tuple(battle.pulse),
+            round_number=battle.round_number,
+            to_move=battle.to_move,
+        )
+
+    def clone(self):
+        """Constant-time copy; fields are immutable so they can be shared."""
+        return BattleSnapshot(self.units, self.refs, self.side, self.pos, self.hp,
+                              self.activated, self.pulse, self.round_number, self.to_move)
+
+    # --- Copy-on-write setters ---
+    def move(self, i, pos):
+        self.pos = self.pos[:i] + (pos,) + self.pos[i + 1:]
+
+    def set_hp(self, i, hp):
+        self.hp = self.hp[:i] + (hp,) + self.hp[i + 1:]
+
+    def damage(self, i, amount):
+        self.set_hp(i, self.hp[i] - amount)
+
+    def heal(self, i, amount):
+        self.set_hp(i, min(self.units[i].hp, self.hp[i] + amount))
+
+    def add_pulse(self, side, amount):
+        player, enemy = self.pulse
+        self.pulse = (player + amount, enemy) if side == PLAYER else (player, enemy + amount)
+
+    def mark_activated(self, i):
+        self.activated |= 1 << i
+
+    def new_round(self):
+        self.activated = 0
+        self.round_number += 1
+        self.to_move = PLAYER
+
+    # --- Queries ---
+    def is_alive(self, i):
+        return self.hp[i] > 0
+
+    def is_activated(self, i):
+        return bool(self.activated >> i & 1)
+
+    def alive(self, side):
+        return [i for i, s in enumerate(self.side) if s == side and self.hp[i] > 0]
+
+    def pending(self, side):
+        return [i for i in self.alive(side) if not self.activated >> i & 1]
+
+    def unit_at(self, pos):
+        for i, p in enumerate(self.pos):
+            if p == pos and self.hp[i] > 0:
+                return i
+        return None
+
+    # --- Writing back ---
+    def restore_to_screen(self, screen):
+        """Put a CombatScreen back into this snapshot's state (e.g. after a preview)."""
+        screen.player_positions = {}
+        screen.enemy_positions = {}
+        screen.activated_player_units = set()
+        screen.activated_enemy_units = set()
+        for i, unit in enumerate(self.refs):
+            unit.current_hp = self.hp[i]
+            player = self.side[i] == PLAYER
+            if self.pos[i] is not None:
+                (screen.player_positions if player else screen.enemy_positions)[unit] = self.pos[i]
+            if self.activated >> i & 1:
+                (screen.activated_player_units if player else screen.activated_enemy_units).add(unit)
+        screen.player_pulse, screen.enemy_pulse = self.pulse
+        screen.round_number = self.round_number
+        screen.active_side = "player" if self.to_move == PLAYER else "enemy"
+        # A restored board starts with nothing selected and no activation under way
+        screen.selected = None
+        screen.unit_being_activated = None
+        screen.activation_phase = None
+        screen.move_tiles.clear()
+        screen.attack_tiles.clear()
+
+    def restore_to_battle(self, battle):
+        """Put a battle_sim.Battle back into this snapshot's state."""
+        battle.pos = list(self.pos)
+        battle.hp = list(self.hp)
+        battle.activated = {i for i in range(len(self.units)) if self.activated >> i & 1}
+        battle.pulse = list(self.pulse)
+        battle.round_number = self.round_number
+        battle.to_move = self.to_move
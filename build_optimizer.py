@@ -0,0 +1,193 @@
+# build_optimizer.py
+# Best evolution-tile unlock order for a unit type under a goal.
+#
+# The search walks the unlock states reachable under Unit.unlock_tile's rule
+# (a tile can be unlocked when it is next to an unlocked one) as 25-bit masks
+# and memoizes the best continuation of every (mask, unlocks left) state, so
+# different orders that reach the same tiles are explored once and a planner
+# reused across calls answers from its memo. Builds are scored with the exact
+# combat math from combat_rules against a reference opponent. Kivy-free.
+#
+# Goals:
+#   'damage'    expected damage of one attack on the opponent
+#   'survival'  expected number of opponent attacks needed to knock the unit out
+#   (row, col)  reach that tile (e.g. a capstone) in as few unlocks as possible
+# Ties go to the build that spends fewer unlocks, then to the one with more
+# tile effects.
+
+from collections import deque, namedtuple
+
+from combat_rules import expected_attacks_to_kill, expected_damage
+from evolution_grid import CENTER_MASK, FULL_MASK, GRID_SIZE, NEIGHBORS, TILE_COUNT, count, frontier, tile_bit
+from game_data import DEFAULT_UNIT_TYPE, get_tile_map, get_unit_type
+
+GOALS = ('damage', 'survival')
+
+# Result of a search: tiles to unlock in order, the final unlocked mask, the
+# final (hp, atk, def_, mov, rng) and the goal score of that build
+Build = namedtuple('Build', 'order mask stats score')
+
+# What the combat math reads from either side
+_Combatant = namedtuple('_Combatant', 'hp atk def_ die_faces')
+
+_STAT_INDEX = {'hp': 0, 'atk': 1, 'def_': 2, 'mov': 3, 'rng': 4}
+
+
+class BuildPlanner:
+    def __init__(self, unit_type, goal='damage', opponent=None, passable=FULL_MASK, base=None):
+        """
+        :param unit_type: unit type name; its tile map and base stats are used
+        :param goal: 'damage', 'survival' or a (row, col) tile to reach
+        :param opponent: reference enemy with hp, atk, def_ and die_faces
+            (a UnitType works); defaults to the default unit type
+        :param passable: mask of tiles the search may unlock, e.g. only the
+            tiles that carry an effect
+        :param base: (hp, atk, def_, mov, rng) to build on instead of the type's
+        """
+        if isinstance(goal, str):
+            if goal not in GOALS:
+                raise ValueError(f"Unknown goal {goal!r}; expected one of {list(GOALS)} or a (row, col) tile")
+        else:
+            row, col = goal
+            if not (0 <= row < GRID_SIZE and 0 <= col < GRID_SIZE):
+                raise ValueError(f"Goal tile {goal!r} is outside the {GRID_SIZE}x{GRID_SIZE} grid")
+            goal = (row, col)
+        self.unit_type = unit_type
+        self.goal = goal
+        self.passable = passable
+        unit = get_unit_type(unit_type)
+        self.die_faces = unit.die_faces
+        self.base = tuple(base) if base is not None else (unit.hp, unit.atk, unit.def_, unit.mov, unit.rng)
+        self.opponent = opponent if opponent is not None else DEFAULT_UNIT_TYPE
+
+        # Per tile: (stat index, amount) for stat effects, or None
+        self.tile_stats = [None] * TILE_COUNT
+        self.effect_mask = 0
+        for (row, col), effect in get_tile_map(unit_type).items():
+            index = row * GRID_SIZE + col
+            self.effect_mask |= 1 << index
+            if effect.effect_type == 'stat':
+                stat, amount = effect.value
+                self.tile_stats[index] = (_STAT_INDEX[stat], amount)
+
+        self._distance = self._distances_to(goal) if not isinstance(goal, str) else None
+        self._memo = {}     # (mask, unlocks left) -> (key, next tile index or None)
+        self._scores = {}   # stats -> goal score
+
+    def _distances_to(self, target):
+        # Unlocks needed from each tile to the target, moving through passable tiles
+        start = target[0] * GRID_SIZE + target[1]
+        distance = [None] * TILE_COUNT
+        distance[start] = 0
+        queue = deque([start])
+        while queue:
+            index = queue.popleft()
+            neighbors = NEIGHBORS[index]
+            while neighbors:
+                low = neighbors & -neighbors
+                neighbors ^= low
+                n = low.bit_length() - 1
+                if distance[n] is None and self.passable & low:
+                    distance[n] = distance[index] + 1
+                    queue.append(n)
+        return distance
+
+    def stats_for(self, mask):
+        """(hp, atk, def_, mov, rng) with the stat effects of the tiles in mask."""
+        stats = list(self.base)
+        tiles = mask & self.effect_mask
+        while tiles:
+            low = tiles & -tiles
+            tiles ^= low
+            bonus = self.tile_stats[low.bit_length() - 1]
+            if bonus is not None:
+                stats[bonus[0]] += bonus[1]
+        return tuple(stats)
+
+    def score(self, mask):
+        """Goal score of a build; higher is better."""
+        if self._distance is not None:
+            if mask & tile_bit(self.goal):
+                return 0
+            # Minus the unlocks still needed to reach the goal tile
+            steps = [self._distance[i] for i in range(TILE_COUNT)
+                     if mask >> i & 1 and self._distance[i] is not None]
+            return -min(steps) if steps else -TILE_COUNT
+        stats = self.stats_for(mask)
+        score = self._scores.get(stats)
+        if score is None:
+            unit = _Combatant(stats[0], stats[1], stats[2], self.die_faces)
+            if self.goal == 'damage':
+                score = expected_damage(unit, self.opponent)
+            else:
+                score = expected_attacks_to_kill(self.opponent, unit, unit.hp)
+            self._scores[stats] = score
+        return score
+
+    def _search(self, mask, left):
+        hit = self._memo.get((mask, left))
+        if hit is not None:
+            return hit
+        # Stopping here: (score, minus unlocks spent from here, tile effects)
+        best = (self.score(mask), 0, count(mask & self.effect_mask))
+        best_move = None
+        if left > 0:
+            moves = frontier(mask) & self.passable
+            while moves:
+                low = moves & -moves
+                moves ^= low
+                (score, spent, effects), _ = self._search(mask | low, left - 1)
+                key = (score, spent - 1, effects)
+                if key > best:
+                    best, best_move = key, low.bit_length() - 1
+        self._memo[(mask, left)] = (best, best_move)
+        return best, best_move
+
+    def plan(self, unlocks, start_mask=CENTER_MASK):
+        """
+        Best build reachable from start_mask with at most `unlocks` more tiles.
+
+        :return: Build
+        """
+        order = []
+        mask = start_mask
+        (score, _, _), move = self._search(mask, unlocks)
+        while move is not None:
+            order.append(divmod(move, GRID_SIZE))
+            mask |= 1 << move
+            unlocks -= 1
+            _, move = self._search(mask, unlocks)
+        return Build(order, mask, self.stats_for(mask), score)
+
+
+# Planners by (unit_type, goal, passable, base), so repeated hints reuse memos
+_planners = {}
+
+
+def planner_for(unit_type, goal='damage', passable=FULL_MASK, base=None):
+    key = (unit_type, goal if isinstance(goal, str) else tuple(goal), passable,
+           tuple(base) if base is not None else None)
+    planner = _planners.get(key)
+    if planner is None:
+        planner = _planners[key] = BuildPlanner(unit_type, goal, passable=passable, base=base)
+    return planner
+
+
+def plan_build(unit_type, goal='damage', unlocks=4, start_mask=CENTER_MASK, passable=FULL_MASK):
+    """Best unlock order for a fresh unit of unit_type (see BuildPlanner)."""
+    return planner_for(unit_type, goal, passable).plan(unlocks, start_mask)
+
+
+def suggest_tile(unit, goal='damage', lookahead=4, passable=None):
+    """
+    First tile of the best build for this unit over the next `lookahead`
+    unlocks, or None if no unlock improves on the current build.
+
+    :param passable: tiles that may be unlocked; defaults to the unit's tiles
+        with an effect, as those are the ones the level-up screen offers
+    """
+    if passable is None:
+        passable = sum(tile_bit(pos) for pos in get_tile_map(unit.unit_type))
+    base = (unit.base_hp, unit.base_atk, unit.base_def, unit.base_mov, unit.base_rng)
+    build = planner_for(unit.unit_type, goal, passable, base).plan(lookahead, unit.unlocked_mask)
+    return build.order[0] if build.order else None
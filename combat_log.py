@@ -0,0 +1,39 @@
+# combat_log.py
+# Bounded combat log model. Kivy-free.
+#
+# Lines go into a ring buffer (a deque with maxlen), so a long battle keeps at
+# most `cap` lines and the oldest fall off. The combat screen renders the log
+# as one text widget at most once per frame, however many lines were added
+# in between.
+
+from collections import deque
+
+DEFAULT_LOG_CAP = 100
+
+
+class CombatLog:
+    def __init__(self, cap=DEFAULT_LOG_CAP):
+        if cap < 1:
+            raise ValueError(f"Combat log cap must be at least 1, got {cap!r}")
+        self.lines = deque(maxlen=cap)
+        self.dirty = False   # True when lines changed since the last render
+
+    @property
+    def cap(self):
+        return self.lines.maxlen
+
+    def append(self, message):
+        self.lines.append(message)
+        self.dirty = True
+
+    def clear(self):
+        self.lines.clear()
+        self.dirty = True
+
+    def text(self):
+        """All lines, newest first, as one string; marks the log as rendered."""
+        self.dirty = False
+        return '\n'.join(reversed(self.lines))
+
+    def __len__(self):
+        return len(self.lines)
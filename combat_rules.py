@@ -0,0 +1,135 @@
+# combat_rules.py
+# Kivy-free combat rules shared by the combat screen, the headless battle
+# simulator and the AI policies.
+
+import random
+from math import comb, ceil
+
+DEFAULT_DIE_FACES = ['Sword', 'Sword', 'Shield', 'Shield', 'Pulse', 'Pulse']
+
+
+# --- Dice System ---
+class Die:
+    def __init__(self, faces=None, rng=None):
+        # Default: balanced die
+        if faces is None:
+            faces = DEFAULT_DIE_FACES
+        self.faces = faces
+        self.sides = len(faces)
+        self.rng = rng if rng is not None else random
+
+    def roll(self):
+        return self.rng.choice(self.faces)
+
+
+def roll_dice(num, unit=None, rng=None):
+    """Roll dice for a unit using their specific die faces."""
+    if unit and hasattr(unit, 'die_faces'):
+        die = Die(unit.die_faces, rng)
+    else:
+        die = Die(rng=rng)  # Default balanced die
+    return [die.roll() for _ in range(num)]
+
+
+def resolve_attack(attacker, defender, rng=None):
+    """Roll an attack and return (atk_dice, def_dice, net_damage)."""
+    atk_dice = roll_dice(attacker.atk, attacker, rng)
+    def_dice = roll_dice(defender.def_, defender, rng)
+    net_damage = max(0, atk_dice.count('Sword') - def_dice.count('Shield'))
+    return atk_dice, def_dice, net_damage
+
+
+def manhattan(a, b):
+    """Orthogonal distance between two grid positions."""
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+# --- Exact combat math ---
+# Attack dice and defence dice are independent binomials, so the damage
+# distribution only depends on the dice counts and the face odds. Results
+# are cached because battles only ever see a handful of distinct stat lines.
+_distribution_cache = {}
+
+
+def _binomial(n, p):
+    return [comb(n, k) * p ** k * (1 - p) ** (n - k) for k in range(n + 1)]
+
+
+def damage_distribution(atk, atk_faces, def_, def_faces):
+    """Return a tuple where index n is the probability of dealing n damage."""
+    key = (atk, tuple(atk_faces), def_, tuple(def_faces))
+    dist = _distribution_cache.get(key)
+    if dist is None:
+        p_sword = atk_faces.count('Sword') / len(atk_faces) if atk_faces else 0.0
+        p_shield = def_faces.count('Shield') / len(def_faces) if def_faces else 0.0
+        swords = _binomial(max(0, atk), p_sword)
+        shields = _binomial(max(0, def_), p_shield)
+        probs = [0.0] * len(swords)
+        for s, p_s in enumerate(swords):
+            for h, p_h in enumerate(shields):
+                probs[max(0, s - h)] += p_s * p_h
+        dist = tuple(probs)
+        _distribution_cache[key] = dist
+    return dist
+
+
+def attack_distribution(attacker, defender):
+    """Damage distribution for attacker hitting defender."""
+    return damage_distribution(attacker.atk, attacker.die_faces,
+                               defender.def_, defender.die_faces)
+
+
+_mean_cache = {}
+
+
+def expected_damage(attacker, defender):
+    """Mean damage of a single attack."""
+    dist = attack_distribution(attacker, defender)
+    mean = _mean_cache.get(dist)
+    if mean is None:
+        mean = sum(n * p for n, p in enumerate(dist))
+        _mean_cache[dist] = mean
+    return mean
+
+
+def kill_chance(attacker, defender, hp):
+    """Probability that one attack takes a defender on `hp` to 0 or below."""
+    if hp <= 0:
+        return 1.0
+    dist = attack_distribution(attacker, defender)
+    return sum(dist[ceil(hp):])
+
+
+def expected_healing(healer, missing_hp):
+    """Mean HP restored by a Cleric action on an ally missing `missing_hp`."""
+    faces = healer.die_faces
+    p_shield = faces.count('Shield') / len(faces) if faces else 0.0
+    return sum(min(k, missing_hp) * p for k, p in enumerate(_binomial(max(0, healer.atk), p_shield)))
+
+
+_attacks_cache = {}
+
+
+def expected_attacks_to_kill(attacker, defender, hp):
+    """
+    Mean number of attacks attacker needs to take a defender on `hp` to 0,
+    ignoring healing. Infinite if attacker can never deal damage.
+    """
+    dist = attack_distribution(attacker, defender)
+    key = (dist, hp)
+    attacks = _attacks_cache.get(key)
+    if attacks is None:
+        # E[h] = 1 + sum_d p_d * E[h - d]; the d = 0 term moves to the left side
+        miss = dist[0]
+        if miss >= 1.0:
+            attacks = float('inf')
+        else:
+            expect = [0.0] * (max(0, hp) + 1)
+            for h in range(1, hp + 1):
+                total = 1.0
+                for d in range(1, len(dist)):
+                    total += dist[d] * expect[max(0, h - d)]
+                expect[h] = total / (1.0 - miss)
+            attacks = expect[max(0, hp)]
+        _attacks_cache[key] = attacks
+    return attacks
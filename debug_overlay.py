@@ -0,0 +1,94 @@
+# debug_overlay.py
+# On-screen frame-time and hot-path readout for diagnosing stutters on
+# devices where a profiler can't be attached. Toggled from the settings screen.
+#
+# Shows FPS, frame-time percentiles over the last FRAME_WINDOW frames, the
+# last and worst recent duration of each TIMED_PATHS entry (recorded by
+# perf_timings while the overlay is on), widget counts of the screens built
+# so far and the process's resident memory. The text is refreshed every
+# UPDATE_INTERVAL seconds, not every frame, so the overlay itself stays cheap.
+
+from collections import deque
+
+from kivy.clock import Clock
+from kivy.graphics import Color, Rectangle
+from kivy.metrics import dp
+from kivy.uix.label import Label
+
+from perf_timings import percentiles, process_memory, timings
+
+FRAME_WINDOW = 240       # Frames the percentiles cover
+UPDATE_INTERVAL = 0.5    # Seconds between text refreshes
+TIMED_PATHS = ('build_grid', 'refresh_unit_display', 'enemy_turn')
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:.1f}" if seconds is not None else "-"
+
+
+class DebugOverlay(Label):
+    def __init__(self, manager, **kwargs):
+        """
+        :param manager: the app's ScreenManager; widgets are counted per built screen
+        """
+        super().__init__(font_size='11sp', halign='left', valign='top',
+                         size_hint=(None, None), color=(1, 1, 0.6, 1), **kwargs)
+        self.manager = manager
+        self.frame_times = deque(maxlen=FRAME_WINDOW)
+        self._events = []
+        self.bind(texture_size=self._fit)
+
+        with self.canvas.before:
+            Color(0, 0, 0, 0.6)
+            self._background = Rectangle(pos=self.pos, size=self.size)
+        self.bind(pos=self._redraw, size=self._redraw)
+
+    def _fit(self, *args):
+        # Hug the text, pinned to the window's top-left corner
+        self.size = (self.texture_size[0] + dp(8), self.texture_size[1] + dp(8))
+        window = self.get_root_window()
+        if window is not None:
+            self.pos = (0, window.height - self.height)
+
+    def _redraw(self, *args):
+        self._background.pos = self.pos
+        self._background.size = self.size
+
+    def start(self):
+        """Start sampling frames and hot-path timings."""
+        if self._events:
+            return
+        timings.enabled = True
+        self.frame_times.clear()
+        self._events = [
+            Clock.schedule_interval(self.on_frame, 0),   # Every frame
+            Clock.schedule_interval(self.update, UPDATE_INTERVAL),
+        ]
+        self.update()
+
+    def on_frame(self, dt):
+        self.frame_times.append(dt)
+
+    def stop(self):
+        """Stop sampling; timed paths go back to plain calls."""
+        for event in self._events:
+            event.cancel()
+        self._events = []
+        timings.enabled = False
+        timings.clear()
+
+    def update(self, *args):
+        p50, p95, p99 = percentiles(self.frame_times)
+        lines = [
+            f"FPS {Clock.get_fps():.1f}   frame ms p50 {_ms(p50)}  p95 {_ms(p95)}  p99 {_ms(p99)}",
+        ]
+        for name in TIMED_PATHS:
+            lines.append(f"{name}: last {_ms(timings.last(name))} ms, worst {_ms(timings.worst(name))} ms")
+
+        counts = ", ".join(f"{screen.name} {sum(1 for _ in screen.walk())}" for screen in self.manager.screens)
+        lines.append(f"widgets: {counts}")
+
+        memory = process_memory()
+        lines.append(f"memory: {memory / (1024 * 1024):.1f} MB" if memory is not None else "memory: -")
+        self.text = "\n".join(lines)
+        self._fit()
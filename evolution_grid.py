@@ -0,0 +1,73 @@
+# evolution_grid.py
+# The 5x5 evolution grid as a 25-bit mask.
+#
+# Tile (row, col) is bit row * GRID_SIZE + col. A precomputed table holds each
+# tile's orthogonal neighbours as a mask, so "is this tile unlockable",
+# "which tiles can be unlocked next" and "how many tiles are unlocked" are a
+# few integer operations instead of loops over sets of tuples.
+
+GRID_SIZE = 5
+TILE_COUNT = GRID_SIZE * GRID_SIZE
+FULL_MASK = (1 << TILE_COUNT) - 1
+CENTER = (2, 2)
+
+
+def tile_bit(pos):
+    return 1 << (pos[0] * GRID_SIZE + pos[1])
+
+
+def _neighbors(index):
+    r, c = divmod(index, GRID_SIZE)
+    mask = 0
+    for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+        if 0 <= nr < GRID_SIZE and 0 <= nc < GRID_SIZE:
+            mask |= 1 << (nr * GRID_SIZE + nc)
+    return mask
+
+
+# NEIGHBORS[i] = mask of the tiles orthogonally adjacent to tile i
+NEIGHBORS = tuple(_neighbors(i) for i in range(TILE_COUNT))
+
+CENTER_MASK = tile_bit(CENTER)
+CENTER_FRONTIER = NEIGHBORS[CENTER[0] * GRID_SIZE + CENTER[1]]   # Unlockable at the start
+
+
+def tiles_to_mask(tiles):
+    mask = 0
+    for r, c in tiles:
+        mask |= 1 << (r * GRID_SIZE + c)
+    return mask
+
+
+def mask_to_tiles(mask):
+    tiles = []
+    while mask:
+        low = mask & -mask
+        tiles.append(divmod(low.bit_length() - 1, GRID_SIZE))
+        mask ^= low
+    return tiles
+
+
+def frontier(unlocked):
+    """Mask of locked tiles adjacent to at least one unlocked tile."""
+    reach = 0
+    mask = unlocked
+    while mask:
+        low = mask & -mask
+        reach |= NEIGHBORS[low.bit_length() - 1]
+        mask ^= low
+    return reach & ~unlocked
+
+
+def grow_frontier(unlocked, available, pos):
+    """
+    (unlocked, available) after unlocking pos, updated incrementally:
+    the new tile leaves the frontier and its locked neighbours join it.
+    """
+    index = pos[0] * GRID_SIZE + pos[1]
+    unlocked |= 1 << index
+    return unlocked, (available | NEIGHBORS[index]) & ~unlocked
+
+
+def count(mask):
+    return bin(mask).count('1')  # int.bit_count() needs Python 3.10
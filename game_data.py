@@ -0,0 +1,200 @@
+# game_data.py
+# Unit types, die faces and evolution tile maps, loaded from data/unit_types.json.
+#
+# The data file is read once at startup, validated, and compiled into
+# read-only lookup tables: a UnitType namedtuple per type (die faces as a
+# shared tuple), a (row, col) -> TileEffect mapping per tile map and the XP
+# curve. All lookups are plain dict hits. The compiled tables are pickled next
+# to the data file and reused while the data file is unchanged, so a cold
+# start skips parsing and validation. Adding a unit type or a tile map is a
+# data change only.
+
+import json
+import os
+import pickle
+from collections import namedtuple
+from types import MappingProxyType
+
+from tile_effects import TileEffect
+from xp_curves import make_curve
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'unit_types.json')
+SCHEMA = 1
+COMPILED_VERSION = 3   # Bump when the compiled layout below changes
+
+GRID_SIZE = 5
+CENTER = (2, 2)
+STATS = ('hp', 'atk', 'def_', 'mov', 'rng')
+EFFECT_TYPES = ('stat', 'ability', 'trait')
+
+# Base stat block of a unit type. Every unit of a type shares the same
+# UnitType (and its die-face tuple) by reference.
+UnitType = namedtuple('UnitType', 'hp atk def_ mov rng die_faces')
+
+# Compiled game data:
+#   unit_types   {type name: UnitType}
+#   default_type UnitType for unknown type names
+#   tile_maps    {type name: {(row, col): TileEffect}}
+#   die_faces    tuple of the face names dice may show
+#   xp_curve     XPCurve for levelling (see xp_curves.py)
+GameData = namedtuple('GameData', 'unit_types default_type tile_maps die_faces xp_curve')
+
+EMPTY_TILE_MAP = MappingProxyType({})
+
+
+def _fail(source, where, message):
+    raise ValueError(f"{os.path.basename(source)}: {where}: {message}")
+
+
+def _check_stats(source, where, block, faces):
+    for stat in STATS:
+        value = block.get(stat)
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            _fail(source, where, f"'{stat}' must be a non-negative integer, got {value!r}")
+    if block['hp'] < 1:
+        _fail(source, where, "'hp' must be at least 1")
+    die = block.get('die_faces')
+    if not isinstance(die, list) or not die:
+        _fail(source, where, "'die_faces' must be a non-empty list")
+    unknown = [f for f in die if f not in faces]
+    if unknown:
+        _fail(source, where, f"unknown die faces {unknown}; known faces are {list(faces)}")
+
+
+def _parse_tile(source, where, key):
+    try:
+        row, col = (int(part) for part in key.split(','))
+    except ValueError:
+        _fail(source, where, f"tile key {key!r} must look like 'row,col'")
+    if not (0 <= row < GRID_SIZE and 0 <= col < GRID_SIZE):
+        _fail(source, where, f"tile {key!r} is outside the {GRID_SIZE}x{GRID_SIZE} grid")
+    if (row, col) == CENTER:
+        _fail(source, where, "the center tile is unlocked from the start and cannot carry an effect")
+    return row, col
+
+
+def _compile_effect(source, where, spec):
+    label = spec.get('label')
+    effect_type = spec.get('type')
+    value = spec.get('value')
+    if not isinstance(label, str) or not label:
+        _fail(source, where, "'label' must be a non-empty string")
+    if effect_type not in EFFECT_TYPES:
+        _fail(source, where, f"'type' must be one of {list(EFFECT_TYPES)}, got {effect_type!r}")
+    if effect_type == 'stat':
+        if (not isinstance(value, list) or len(value) != 2 or value[0] not in STATS
+                or not isinstance(value[1], int)):
+            _fail(source, where, f"stat effects need a value like [\"atk\", 2] with a stat from {list(STATS)}")
+        value = (value[0], value[1])
+    elif not isinstance(value, str) or not value:
+        _fail(source, where, f"{effect_type} effects need a string ID as value")
+    return TileEffect(label, effect_type, value, spec.get('text', ""))
+
+
+def compile_game_data(doc, source=DATA_FILE):
+    """Validate a parsed data file and build the plain-dict form of GameData."""
+    if doc.get('schema') != SCHEMA:
+        _fail(source, 'schema', f"expected schema {SCHEMA}, got {doc.get('schema')!r}")
+    faces = doc.get('die_faces')
+    if not isinstance(faces, list) or not all(isinstance(f, str) for f in faces):
+        _fail(source, 'die_faces', "must be a list of face names")
+    faces = tuple(faces)
+
+    # Identical face lists share one tuple across all types
+    die_tuples = {}
+
+    def stat_block(where, block):
+        _check_stats(source, where, block, faces)
+        die = tuple(block['die_faces'])
+        die = die_tuples.setdefault(die, die)
+        return UnitType(*(block[stat] for stat in STATS), die)
+
+    default_type = stat_block('default_type', doc.get('default_type', {}))
+
+    maps = {}
+    for map_name, tiles in doc.get('tile_maps', {}).items():
+        where = f"tile_maps.{map_name}"
+        if not isinstance(tiles, dict):
+            _fail(source, where, "must map 'row,col' keys to effects")
+        maps[map_name] = {_parse_tile(source, where, key): _compile_effect(source, f"{where}.{key}", spec)
+                          for key, spec in tiles.items()}
+
+    unit_types = {}
+    tile_maps = {}
+    for type_name, block in doc.get('unit_types', {}).items():
+        where = f"unit_types.{type_name}"
+        unit_types[type_name] = stat_block(where, block)
+        map_name = block.get('tile_map')
+        if map_name is not None:
+            if map_name not in maps:
+                _fail(source, where, f"unknown tile_map {map_name!r}")
+            tile_maps[type_name] = maps[map_name]  # Types may share a map
+    if not unit_types:
+        _fail(source, 'unit_types', "at least one unit type is required")
+
+    xp_curve = doc.get('xp_curve', {'type': 'flat', 'per_level': 100})
+    try:
+        xp_curve = make_curve(xp_curve).spec()
+    except (ValueError, AttributeError) as e:
+        _fail(source, 'xp_curve', str(e))
+    return unit_types, default_type, tile_maps, faces, xp_curve
+
+
+def _freeze(unit_types, default_type, tile_maps, faces, xp_curve):
+    frozen_maps = {}
+    by_id = {}
+    for type_name, tiles in tile_maps.items():
+        if id(tiles) not in by_id:
+            by_id[id(tiles)] = MappingProxyType(tiles)
+        frozen_maps[type_name] = by_id[id(tiles)]
+    return GameData(MappingProxyType(unit_types), default_type, MappingProxyType(frozen_maps), faces,
+                    make_curve(xp_curve))
+
+
+def load_game_data(path=DATA_FILE, use_cache=True):
+    """
+    Load, validate and compile the data file.
+
+    With use_cache the compiled tables are read from (or written to)
+    path + '.cache', keyed by the data file's size and modification time.
+    """
+    stat = os.stat(path)
+    key = (COMPILED_VERSION, stat.st_size, stat.st_mtime_ns)
+    cache_file = path + '.cache'
+    if use_cache:
+        try:
+            with open(cache_file, 'rb') as f:
+                cached_key, compiled = pickle.load(f)
+            if cached_key == key:
+                return _freeze(*compiled)
+        except (OSError, pickle.PickleError, EOFError, ValueError, AttributeError, TypeError):
+            pass  # Missing or stale cache: compile from the data file
+    with open(path, 'r', encoding='utf-8') as f:
+        doc = json.load(f)
+    compiled = compile_game_data(doc, path)
+    if use_cache:
+        try:
+            tmp_name = cache_file + '.tmp'
+            with open(tmp_name, 'wb') as f:
+                pickle.dump((key, compiled), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, cache_file)
+        except OSError:
+            pass  # Read-only install: compile again next start
+    return _freeze(*compiled)
+
+
+# Game data for this process, loaded at import
+GAME_DATA = load_game_data()
+UNIT_TYPES = GAME_DATA.unit_types
+DEFAULT_UNIT_TYPE = GAME_DATA.default_type
+XP_CURVE = GAME_DATA.xp_curve
+
+
+def get_unit_type(unit_type):
+    """Stat block for a unit type name (the default block for unknown names)."""
+    return UNIT_TYPES.get(unit_type, DEFAULT_UNIT_TYPE)
+
+
+def get_tile_map(unit_type):
+    """Read-only (row, col) -> TileEffect mapping for a unit type; empty if it has none."""
+    return GAME_DATA.tile_maps.get(unit_type, EMPTY_TILE_MAP)
@@ -3,40 +3,78 @@
 
 class GameState:
     def __init__(self):
-        self.selected_units = []  # Units selected for battle
+        self._party = {}             # Units selected for battle, in selection order (dict as an ordered set)
+        self._party_listeners = []   # Called as listener(changed_units, capacity_changed)
         self.max_party_size = 4   # Maximum units that can be selected
         self.current_level = 1    # Current battle level
         self.game_mode = "campaign"  # campaign, skirmish, etc.
-        
+
+    @property
+    def selected_units(self):
+        """Units selected for battle, in selection order (a copy)."""
+        return list(self._party)
+
+    @selected_units.setter
+    def selected_units(self, units):
+        old = self._party
+        was_full = not self.can_add_unit()
+        self._party = dict.fromkeys(units)
+        changed = [u for u in old if u not in self._party] + [u for u in self._party if u not in old]
+        self._notify(changed, was_full)
+
+    def bind_party(self, listener):
+        """
+        Call listener(changed_units, capacity_changed) after every party change.
+        changed_units are the units that joined or left; capacity_changed is
+        True when the party became full or stopped being full, which changes
+        whether any other unit can be added.
+        """
+        self._party_listeners.append(listener)
+
+    def unbind_party(self, listener):
+        if listener in self._party_listeners:
+            self._party_listeners.remove(listener)
+
+    def _notify(self, changed, was_full):
+        if not changed:
+            return
+        capacity_changed = was_full != (not self.can_add_unit())
+        for listener in list(self._party_listeners):
+            listener(changed, capacity_changed)
+
     def add_unit_to_party(self, unit):
         """Add a unit to the battle party if there's room."""
-        if len(self.selected_units) < self.max_party_size and unit not in self.selected_units:
-            self.selected_units.append(unit)
+        if len(self._party) < self.max_party_size and unit not in self._party:
+            was_full = not self.can_add_unit()
+            self._party[unit] = None
+            self._notify([unit], was_full)
             return True
         return False
-    
+
     def remove_unit_from_party(self, unit):
         """Remove a unit from the battle party."""
-        if unit in self.selected_units:
-            self.selected_units.remove(unit)
+        if unit in self._party:
+            was_full = not self.can_add_unit()
+            del self._party[unit]
+            self._notify([unit], was_full)
             return True
         return False
-    
+
     def clear_party(self):
         """Clear all units from the battle party."""
-        self.selected_units.clear()
-    
+        self.selected_units = []
+
     def get_party_size(self):
         """Get the current party size."""
-        return len(self.selected_units)
-    
+        return len(self._party)
+
     def is_unit_selected(self, unit):
         """Check if a unit is selected for battle."""
-        return unit in self.selected_units
-    
+        return unit in self._party
+
     def can_add_unit(self):
         """Check if more units can be added to the party."""
-        return len(self.selected_units) < self.max_party_size
+        return len(self._party) < self.max_party_size
 
 # Global game state instance
-game_state = GameState() 
\ No newline at end of file
+game_state = GameState()
@@ -2,38 +2,177 @@
 """
 Shattered Worlds Skirmish - Mobile Game Launcher
 This script handles mobile-specific initialization and launches the game.
+
+Startup profiling:
+    python launch.py --profile-startup [FILE] [--headless]
+records wall-clock phases (interpreter start, Kivy import, each screen module
+import, build, first frame) to FILE (default startup_times.txt) and quits
+once the first frame is drawn and the remaining screens are prewarmed.
+--headless uses SDL's offscreen video driver, so this works without a display.
 """
 
+import time
+_START = time.perf_counter()  # Before anything else is imported
+
+import argparse
 import os
 import sys
-from kivy.utils import platform
+
+STARTUP_LOG = 'startup_times.txt'
+PROFILE_TIMEOUT = 30  # Seconds before a profiling run gives up waiting
+
+
+def _process_age():
+    """Seconds since this process started, or None where /proc is not available."""
+    try:
+        with open('/proc/self/stat') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class StartupTimer:
+    """Records named phases as (seconds since launch, seconds the phase took)."""
+    def __init__(self, start=_START):
+        self.start = start
+        self.last = start
+        self.phases = []
+        age = _process_age()
+        if age is not None:
+            # Interpreter startup happened before launch.py ran
+            self.phases.append(('interpreter start', 0.0, age - (time.perf_counter() - start)))
+
+    def mark(self, name):
+        """End a phase that ran since the previous mark."""
+        now = time.perf_counter()
+        self.phases.append((name, now - self.start, now - self.last))
+        self.last = now
+
+    def record(self, name, took):
+        """Add a phase timed by the caller (e.g. one that ran between frames)."""
+        self.phases.append((name, time.perf_counter() - self.start, took))
+
+    def write(self, path):
+        lines = [f"{'phase':<32}{'at (ms)':>10}{'took (ms)':>11}"]
+        for name, at, took in self.phases:
+            lines.append(f"{name:<32}{at * 1000:>10.1f}{took * 1000:>11.1f}")
+        text = '\n'.join(lines) + '\n'
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(text, end='')
+
 
 def setup_mobile_environment():
     """Set up mobile-specific environment variables and configurations."""
+    from kivy.utils import platform
+
     if platform == 'android':
         # Android-specific setup
         os.environ['KIVY_GL_BACKEND'] = 'sdl2'
         os.environ['KIVY_WINDOW'] = 'sdl2'
-        
+
         # Set up Android permissions (handled in buildozer.spec)
         print("Running on Android - mobile optimizations enabled")
-        
+
     elif platform == 'ios':
         # iOS-specific setup
         os.environ['KIVY_GL_BACKEND'] = 'sdl2'
         print("Running on iOS - mobile optimizations enabled")
-        
+
     else:
         # Desktop setup
         print("Running on desktop platform")
 
+
+def profile_startup(path, timer):
+    """Start the app, time its startup phases and quit once all screens are built."""
+    import kivy.app
+    timer.mark('import kivy.app')
+    from kivy.clock import Clock
+    from kivy.core.window import Window
+    timer.mark('create window')
+    import main
+    timer.mark('import main')
+
+    # Time each screen's module import and construction when they happen:
+    # the landing screen during build, the others while prewarming
+    from importlib import import_module
+    make_factory = main.screen_factory
+
+    def timed_factory(module, class_name):
+        build_screen = make_factory(module, class_name)
+
+        def build(name):
+            t0 = time.perf_counter()
+            import_module(module)
+            t1 = time.perf_counter()
+            screen = build_screen(name)
+            timer.record(f'import {module}', t1 - t0)
+            timer.record(f'build {name} screen', time.perf_counter() - t1)
+            return screen
+        return build
+    main.screen_factory = timed_factory
+
+    app = main.VillageGameApp()
+    build = app.build
+
+    def timed_build():
+        timer.mark('create app')
+        root = build()
+        timer.mark('build')
+        return root
+    app.build = timed_build
+
+    prewarm = main.save_repository.get_setting('prewarm_screens', True)
+
+    def first_frame(*args):
+        Window.unbind(on_flip=first_frame)
+        timer.mark('first frame')
+        if prewarm:
+            Clock.schedule_interval(wait_for_prewarm, 0.05)
+        else:
+            app.stop()
+
+    def wait_for_prewarm(dt):
+        pending = app.root.pending()
+        if pending and time.perf_counter() - timer.start < PROFILE_TIMEOUT:
+            return True
+        timer.mark('screens prewarmed' if not pending else 'gave up waiting for prewarm')
+        app.stop()
+        return False
+
+    Window.bind(on_flip=first_frame)
+    app.run()
+    timer.write(path)
+
+
 def main():
     """Main launcher function."""
+    parser = argparse.ArgumentParser(description="Shattered Worlds Skirmish")
+    parser.add_argument('--profile-startup', nargs='?', const=STARTUP_LOG, metavar='FILE',
+                        help=f"time startup phases, write them to FILE (default {STARTUP_LOG}) and quit")
+    parser.add_argument('--headless', action='store_true',
+                        help="render offscreen (no display needed)")
+    args, rest = parser.parse_known_args()
+    sys.argv = sys.argv[:1] + rest  # Leave the remaining options to Kivy
+
+    if args.headless:
+        os.environ.setdefault('SDL_VIDEODRIVER', 'offscreen')
+    timer = StartupTimer() if args.profile_startup else None
+
     print("Shattered Worlds Skirmish - Starting...")
-    
+
     # Set up mobile environment
     setup_mobile_environment()
-    
+
+    if timer:
+        timer.mark('import kivy')
+        profile_startup(args.profile_startup, timer)
+        return
+
     # Import and run the main app
     try:
         from main import VillageGameApp
@@ -49,4 +188,4 @@ def main():
         sys.exit(1)
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
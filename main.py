@@ -1,16 +1,81 @@
+from importlib import import_module
+
 from kivy.app import App
+from kivy.clock import Clock
 from kivy.uix.screenmanager import ScreenManager, FadeTransition
 from kivy.core.window import Window
 from kivy.utils import platform
 
-# Import all the screens we'll use
-from screens.landing import LandingScreen
-from screens.battle import BattleScreen
-from screens.units import UnitsScreen
-from screens.structures import StructuresScreen
-from screens.level_up import LevelUpScreen
-from screens.combat import CombatScreen
-from screens.settings import SettingsScreen
+from asset_pipeline import texture_cache
+from save_repository import save_repository
+
+# Every screen we'll use: (name, module, class). Screens are built the first
+# time they are shown or looked up; their modules are imported then too.
+SCREENS = (
+    ('landing', 'screens.landing', 'LandingScreen'),
+    ('battle', 'screens.battle', 'BattleScreen'),
+    ('units', 'screens.units', 'UnitsScreen'),
+    ('structures', 'screens.structures', 'StructuresScreen'),
+    ('level_up', 'screens.level_up', 'LevelUpScreen'),
+    ('combat', 'screens.combat', 'CombatScreen'),
+    ('settings', 'screens.settings', 'SettingsScreen'),
+)
+
+# Screens built ahead of time after the first frame, most likely first
+PREWARM_ORDER = ('units', 'structures', 'combat', 'settings', 'level_up', 'battle')
+
+
+def screen_factory(module, class_name):
+    def build(name):
+        return getattr(import_module(module), class_name)(name=name)
+    return build
+
+
+class LazyScreenManager(ScreenManager):
+    """ScreenManager that builds each registered screen the first time it is needed."""
+    def __init__(self, **kwargs):
+        self._factories = {}
+        super().__init__(**kwargs)
+
+    def register(self, name, factory):
+        """Register factory(name) -> Screen to be called on first use of name."""
+        self._factories[name] = factory
+
+    def pending(self):
+        """Names of registered screens not built yet."""
+        return list(self._factories)
+
+    def build_screen(self, name):
+        factory = self._factories.pop(name, None)
+        if factory is not None:
+            self.add_widget(factory(name))
+
+    def get_screen(self, name):
+        self.build_screen(name)
+        return super().get_screen(name)
+
+    def has_screen(self, name):
+        return name in self._factories or super().has_screen(name)
+
+    def prewarm(self, names=None):
+        """
+        Build the given (default: all) pending screens ahead of use, one per
+        frame so the UI stays responsive. Widgets must be created on the UI
+        thread, so this runs between frames rather than on another thread.
+        """
+        queue = [n for n in (names if names is not None else self.pending()) if n in self._factories]
+
+        def build_next(dt):
+            while queue:
+                name = queue.pop(0)
+                if name in self._factories:
+                    self.build_screen(name)
+                    texture_cache.preload(name)
+                    break
+            if queue:
+                Clock.schedule_once(build_next)
+        if queue:
+            Clock.schedule_once(build_next)
 
 
 class VillageGameApp(App):
@@ -38,19 +103,49 @@ class VillageGameApp(App):
             Window.softinput_mode = 'below_target'
         
         # Create a ScreenManager to handle screen switching
-        sm = ScreenManager(transition=FadeTransition())
-
-        # Add each screen to the manager, using a unique name for each
-        sm.add_widget(LandingScreen(name='landing'))
-        sm.add_widget(BattleScreen(name='battle'))
-        sm.add_widget(UnitsScreen(name='units'))
-        sm.add_widget(StructuresScreen(name='structures'))
-        sm.add_widget(LevelUpScreen(name='level_up'))
-        sm.add_widget(CombatScreen(name='combat'))
-        sm.add_widget(SettingsScreen(name='settings'))
-        
+        sm = LazyScreenManager(transition=FadeTransition())
+
+        # Register each screen under a unique name; only the landing screen
+        # is built before the first frame
+        for name, module, class_name in SCREENS:
+            sm.register(name, screen_factory(module, class_name))
+        sm.current = 'landing'
+
+        # Keep the shown screen's textures at the front of the cache and
+        # start decoding any it doesn't have yet
+        sm.bind(current=lambda sm, name: texture_cache.preload(name))
+
+        # Build the rest while the player looks at the landing screen
+        if save_repository.get_setting('prewarm_screens', True):
+            Clock.schedule_once(lambda dt: sm.prewarm(PREWARM_ORDER), 0.5)
+
         # Return the root widget (the ScreenManager)
         return sm
 
+    def on_start(self):
+        if save_repository.get_setting('debug_overlay', False):
+            self.set_debug_overlay(True)
+
+    def set_debug_overlay(self, enabled):
+        """Show or hide the frame-time overlay on top of every screen."""
+        overlay = getattr(self, 'debug_overlay', None)
+        if enabled and overlay is None:
+            from debug_overlay import DebugOverlay
+            overlay = self.debug_overlay = DebugOverlay(self.root)
+            Window.add_widget(overlay)
+            overlay.start()
+        elif not enabled and overlay is not None:
+            overlay.stop()
+            Window.remove_widget(overlay)
+            self.debug_overlay = None
+
+    def on_pause(self):
+        # Android may kill a paused app without calling on_stop, so save now
+        save_repository.flush()
+        return True
+
+    def on_stop(self):
+        save_repository.flush()
+
 if __name__ == '__main__':
     VillageGameApp().run()
@@ -0,0 +1,91 @@
+# perf_timings.py
+# Lightweight timing registry for hot paths. Kivy-free.
+#
+# Decorate a function with @timed('name') and the duration of each call is
+# recorded while timings.enabled is True (the debug overlay switches it on).
+# While disabled, a timed call costs one attribute check on top of the call.
+# With SWS_TIMINGS=0 in the environment the decorators are compiled out:
+# timed() hands back the undecorated function.
+
+import os
+import time
+from collections import deque
+from functools import wraps
+
+COMPILED_IN = os.environ.get('SWS_TIMINGS', '1') != '0'
+HISTORY = 60  # Durations kept per name
+
+
+class TimingRegistry:
+    def __init__(self, history=HISTORY):
+        self.enabled = False
+        self.history = history
+        self.samples = {}  # name -> recent durations in seconds, oldest first
+
+    def record(self, name, seconds):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.history)
+        samples.append(seconds)
+
+    def last(self, name):
+        """Most recent duration of name in seconds, or None if it never ran."""
+        samples = self.samples.get(name)
+        return samples[-1] if samples else None
+
+    def worst(self, name):
+        """Longest recent duration of name in seconds, or None if it never ran."""
+        samples = self.samples.get(name)
+        return max(samples) if samples else None
+
+    def clear(self):
+        self.samples.clear()
+
+
+# Registry shared by the timed hot paths and the debug overlay
+timings = TimingRegistry()
+
+
+def timed(name, registry=timings):
+    """Decorator recording each call's duration under name while registry.enabled."""
+    def decorate(fn):
+        if not COMPILED_IN:
+            return fn
+        clock = time.perf_counter
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return fn(*args, **kwargs)
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                registry.record(name, clock() - start)
+        return wrapper
+    return decorate
+
+
+def percentiles(values, points=(50, 95, 99)):
+    """Nearest-rank percentiles of values, in the order of points; empty input gives Nones."""
+    ordered = sorted(values)
+    if not ordered:
+        return [None] * len(points)
+    last = len(ordered) - 1
+    return [ordered[min(last, max(0, -(-p * len(ordered) // 100) - 1))] for p in points]
+
+
+def process_memory():
+    """Resident memory of this process in bytes, or None where it can't be read."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Peak rather than current; reported in kilobytes on Linux, bytes on macOS
+    return peak if os.uname().sysname == 'Darwin' else peak * 1024
@@ -0,0 +1,216 @@
+# roster_arrays.py
+# Columnar (struct-of-arrays) roster for bulk operations.
+#
+# A list of Unit objects is convenient for the screens but every bulk change
+# (award XP to an army, heal everyone, "all Clerics above level 5 by ATK") is a
+# Python loop. RosterArrays keeps one NumPy array per field instead, so those
+# operations run vectorized over tens of thousands of units, and converts back
+# to Unit objects when the UI or a save needs them.
+#
+# The hp, atk, def_, mov and rng columns hold effective stats (base stats plus
+# tile effects), which is what filters, sorting and healing want. They are
+# read-only: base stats and abilities are kept per unit and are what gets
+# written back.
+#
+# NumPy is optional: the game itself never imports this module, and creating
+# a RosterArrays without NumPy installed raises ImportError.
+
+from evolution_grid import GRID_SIZE
+from game_data import XP_CURVE
+from unit_data import Unit, UNIT_TYPES, shared_die_faces
+from xp_curves import FlatCurve
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+# Numeric columns and their dtypes
+STAT_FIELDS = ('level', 'xp', 'hp', 'atk', 'def_', 'mov', 'rng', 'current_hp')
+WRITABLE_FIELDS = ('level', 'xp', 'current_hp')
+_DTYPES = {
+    'level': 'int32', 'xp': 'int64', 'hp': 'int32', 'atk': 'int32', 'def_': 'int32',
+    'mov': 'int32', 'rng': 'int32', 'current_hp': 'int32',
+    'type_codes': 'int16',   # Index into RosterArrays.type_names
+    'position': 'int8',      # Evolution position, row * GRID_SIZE + col
+    'unlocked': 'uint32',    # 25-bit evolution masks
+    'available': 'uint32',
+}
+
+
+def _popcount(masks):
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(masks).astype('int32')
+    bits = np.unpackbits(masks.astype('<u4').view('uint8').reshape(-1, 4), axis=1)
+    return bits.sum(axis=1, dtype='int32')
+
+
+class RosterArrays:
+    def __init__(self, size=0, type_names=None):
+        if np is None:
+            raise ImportError("RosterArrays needs NumPy (pip install numpy)")
+        self.type_names = list(type_names if type_names is not None else UNIT_TYPES)
+        self._codes = {name: k for k, name in enumerate(self.type_names)}
+        for field, dtype in _DTYPES.items():
+            setattr(self, field, np.zeros(size, dtype=dtype))
+        # Per-unit values with no useful numeric form, kept as plain lists
+        self.names = [''] * size
+        self.die_faces = [()] * size
+        # (base_hp, base_atk, base_def, base_mov, base_rng, abilities, traits)
+        self.base = [(0, 0, 0, 0, 0, (), ())] * size
+
+    def __len__(self):
+        return len(self.level)
+
+    def code_for(self, unit_type):
+        """Code for unit_type, registering types this roster has not seen yet."""
+        code = self._codes.get(unit_type)
+        if code is None:
+            code = self._codes[unit_type] = len(self.type_names)
+            self.type_names.append(unit_type)
+        return code
+
+    # --- Conversion ---
+    @classmethod
+    def from_units(cls, units):
+        roster = cls(len(units))
+        for field in STAT_FIELDS:
+            getattr(roster, field)[:] = [getattr(u, field) for u in units]
+        roster.type_codes[:] = [roster.code_for(u.unit_type) for u in units]
+        roster.position[:] = [u.evolution_position[0] * GRID_SIZE + u.evolution_position[1] for u in units]
+        roster.unlocked[:] = [u.unlocked_mask for u in units]
+        roster.available[:] = [u.available_mask for u in units]
+        roster.names = [u.name for u in units]
+        roster.die_faces = [u.die_faces for u in units]
+        roster.base = [(u.base_hp, u.base_atk, u.base_def, u.base_mov, u.base_rng,
+                        tuple(u.base_abilities), tuple(u.base_traits)) for u in units]
+        return roster
+
+    def to_units(self, indices=None):
+        """Build Unit objects for all units, or for the given indices in that order."""
+        if indices is None:
+            indices = range(len(self))
+        return [self._build(k) for k in np.asarray(indices, dtype='int64').tolist()]
+
+    def _build(self, k):
+        unit = Unit(self.names[k], self.type_names[self.type_codes[k]])
+        self._copy_to(k, unit)
+        return unit
+
+    def write_back(self, units):
+        """Copy the arrays onto the Unit objects this roster was built from (same order)."""
+        for k, unit in enumerate(units):
+            self._copy_to(k, unit)
+
+    def _copy_to(self, k, unit):
+        for field in WRITABLE_FIELDS:
+            setattr(unit, field, int(getattr(self, field)[k]))
+        hp, atk, def_, mov, rng, abilities, traits = self.base[k]
+        unit.base_hp, unit.base_atk, unit.base_def, unit.base_mov, unit.base_rng = hp, atk, def_, mov, rng
+        unit.base_abilities = list(abilities)
+        unit.base_traits = list(traits)
+        unit.die_faces = shared_die_faces(self.die_faces[k])
+        unit.evolution_position = divmod(int(self.position[k]), GRID_SIZE)
+        unit.set_unlocked_mask(int(self.unlocked[k]))
+
+    def take(self, indices):
+        """A new RosterArrays holding only the given units, in that order."""
+        indices = np.asarray(indices, dtype='int64')
+        subset = RosterArrays(0, self.type_names)
+        for field in _DTYPES:
+            setattr(subset, field, getattr(self, field)[indices])
+        picked = indices.tolist()
+        subset.names = [self.names[k] for k in picked]
+        subset.die_faces = [self.die_faces[k] for k in picked]
+        subset.base = [self.base[k] for k in picked]
+        return subset
+
+    # --- Bulk operations ---
+    def award_xp(self, amount, where=None, curve=XP_CURVE):
+        """
+        Add XP to every unit (or those selected by the boolean mask where) and
+        level them up, exactly like Unit.add_xp.
+
+        :param amount: XP per unit, a scalar or an array of per-unit amounts
+        :return: boolean mask of units that gained at least one level
+        """
+        amount = np.broadcast_to(np.asarray(amount, dtype='int64'), self.xp.shape)
+        if where is None:
+            where = np.ones(len(self), dtype=bool)
+        before = self.level.copy()
+        level = self.level[where].astype('int64')
+        if isinstance(curve, FlatCurve):
+            total = (level - 1) * curve.per_level + self.xp[where] + amount[where]
+            gained, xp = np.divmod(total, curve.per_level)
+            new_level = gained + 1
+        else:
+            # Lifetime XP, then one searchsorted over the cumulative table
+            curve.total_xp(int(level.max(initial=1)), 0)
+            totals = np.asarray(curve.totals, dtype='int64')
+            total = totals[level - 1] + self.xp[where] + amount[where]
+            if len(total) and total.max() >= totals[-1]:
+                curve.level_for(int(total.max()))  # Grow the table to cover the grant
+                totals = np.asarray(curve.totals, dtype='int64')
+            new_level = np.searchsorted(totals, total, side='right')
+            xp = total - totals[new_level - 1]
+        self.level[where] = new_level
+        self.xp[where] = xp
+        return self.level > before
+
+    def heal_all(self, where=None):
+        """Restore current_hp to hp, as the combat screen does before a battle."""
+        if where is None:
+            self.current_hp[:] = self.hp
+        else:
+            self.current_hp[where] = self.hp[where]
+
+    def unspent_levels(self):
+        """Levels not yet spent on evolution tiles (one tile per level)."""
+        return np.maximum(self.level - _popcount(self.unlocked), 0)
+
+    def mask(self, unit_type=None, min_level=None, max_level=None, alive=None, **stat_ranges):
+        """
+        Boolean mask of units matching all filters.
+
+        :param unit_type: a type name or a collection of names
+        :param alive: True for current_hp > 0, False for knocked-out units
+        :param stat_ranges: per-stat (low, high) inclusive bounds, either may be None,
+            e.g. atk=(4, None)
+        """
+        keep = np.ones(len(self), dtype=bool)
+        if unit_type is not None:
+            names = [unit_type] if isinstance(unit_type, str) else list(unit_type)
+            codes = [self._codes[n] for n in names if n in self._codes]
+            keep &= np.isin(self.type_codes, codes)
+        stat_ranges['level'] = (min_level, max_level)
+        for field, (low, high) in stat_ranges.items():
+            if field not in STAT_FIELDS:
+                raise ValueError(f"Unknown stat {field!r}")
+            column = getattr(self, field)
+            if low is not None:
+                keep &= column >= low
+            if high is not None:
+                keep &= column <= high
+        if alive is not None:
+            keep &= (self.current_hp > 0) == alive
+        return keep
+
+    def select(self, **filters):
+        """Indices of units matching the filters (see mask)."""
+        return np.flatnonzero(self.mask(**filters))
+
+    def order_by(self, *fields, descending=False, indices=None):
+        """
+        Indices sorted by fields, first field most significant; ties keep
+        roster order. Restrict to a subset by passing its indices.
+        """
+        if indices is None:
+            indices = np.arange(len(self))
+        indices = np.asarray(indices, dtype='int64')
+        if not fields:
+            return indices
+        keys = []
+        for field in reversed(fields):  # lexsort treats the last key as primary
+            column = getattr(self, field)[indices].astype('int64')
+            keys.append(-column if descending else column)
+        return indices[np.lexsort(keys)]
@@ -0,0 +1,308 @@
+# roster_store.py
+# Optional SQLite storage backend for large rosters.
+#
+# The binary save keeps the whole roster in one file and the repository keeps
+# it in memory, which is fine for a few hundred units. For much larger rosters
+# this store keeps units, their evolution tiles and the village upgrades in a
+# SQLite database (stdlib sqlite3, no server, works offline) with indexes on
+# unit type, level and party membership, so the Units screen can filter and
+# page through the roster without loading all of it.
+#
+# Not wired into the game yet: the screens still read the binary save through
+# save_repository. This module is the storage layer for moving the Units
+# screen onto RosterStore.page() later; import_save() fills a store from a save.
+#
+# Units are addressed by their row ID. Evolution tiles are stored as 25-bit
+# masks like in the binary save; ability and trait lists as compact JSON.
+# Stats are base stats, without tile effects.
+
+import json
+import sqlite3
+from collections import namedtuple
+from contextlib import contextmanager
+
+from evolution_grid import GRID_SIZE, mask_to_tiles
+from save_sections import Section, section_path
+from unit_data import Unit, load_save
+
+ROSTER_DB = 'roster.db'
+SCHEMA_VERSION = 1
+
+# One page of query results: list of (unit_id, Unit), total matching rows,
+# zero-based page number and page size.
+RosterPage = namedtuple('RosterPage', 'units total number size')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    unit_type TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    xp INTEGER NOT NULL,
+    hp INTEGER NOT NULL,
+    atk INTEGER NOT NULL,
+    def_ INTEGER NOT NULL,
+    mov INTEGER NOT NULL,
+    rng INTEGER NOT NULL,
+    current_hp INTEGER NOT NULL,
+    die_faces TEXT NOT NULL,
+    evolution_position INTEGER NOT NULL,
+    unlocked_tiles INTEGER NOT NULL,
+    available_tiles INTEGER NOT NULL,
+    abilities TEXT NOT NULL,
+    traits TEXT NOT NULL,
+    party_slot INTEGER
+);
+CREATE INDEX IF NOT EXISTS units_type_level ON units (unit_type, level);
+CREATE INDEX IF NOT EXISTS units_level ON units (level);
+CREATE INDEX IF NOT EXISTS units_party ON units (party_slot) WHERE party_slot IS NOT NULL;
+CREATE TABLE IF NOT EXISTS upgrades (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_COLUMNS = ('name', 'unit_type', 'level', 'xp', 'hp', 'atk', 'def_', 'mov', 'rng', 'current_hp',
+            'die_faces', 'evolution_position', 'unlocked_tiles', 'available_tiles', 'abilities', 'traits')
+_SELECT = 'SELECT id, ' + ', '.join(_COLUMNS) + ' FROM units'
+_INSERT = f"INSERT INTO units ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+_UPDATE = 'UPDATE units SET ' + ', '.join(f'{c} = ?' for c in _COLUMNS) + ' WHERE id = ?'
+
+# Sort keys the query API accepts; the unit ID breaks ties so paging is stable
+ORDERINGS = {
+    'id': 'id',
+    'name': 'name, id',
+    'level': 'level, id',
+    'unit_type': 'unit_type, level, id',
+    'party': 'party_slot, id',
+}
+
+
+def _row(unit):
+    """Column values for a Unit, in _COLUMNS order."""
+    r, c = unit.evolution_position
+    return (
+        unit.name, unit.unit_type, unit.level, unit.xp,
+        unit.base_hp, unit.base_atk, unit.base_def, unit.base_mov, unit.base_rng, unit.current_hp,
+        ','.join(unit.die_faces),
+        r * GRID_SIZE + c,
+        unit.unlocked_mask,
+        unit.available_mask,
+        json.dumps(unit.base_abilities, separators=(',', ':')),
+        json.dumps(unit.base_traits, separators=(',', ':')),
+    )
+
+
+def _unit(row):
+    """Build a Unit from a _SELECT row (the row ID comes first)."""
+    (_, name, unit_type, level, xp, hp, atk, def_, mov, rng, current_hp,
+     die_faces, pos, unlocked, available, abilities, traits) = row
+    return Unit.from_dict({
+        'name': name,
+        'unit_type': unit_type,
+        'level': level,
+        'xp': xp,
+        'hp': hp,
+        'atk': atk,
+        'def_': def_,
+        'mov': mov,
+        'rng': rng,
+        'current_hp': current_hp,
+        'die_faces': die_faces.split(',') if die_faces else [],
+        'evolution_position': divmod(pos, GRID_SIZE),
+        'unlocked_tiles': mask_to_tiles(unlocked),
+        'available_tiles': mask_to_tiles(available),
+        'abilities': json.loads(abilities),
+        'traits': json.loads(traits),
+    })
+
+
+def _where(unit_type=None, min_level=None, max_level=None, in_party=None):
+    clauses = []
+    params = []
+    if unit_type is not None:
+        clauses.append('unit_type = ?')
+        params.append(unit_type)
+    if min_level is not None:
+        clauses.append('level >= ?')
+        params.append(min_level)
+    if max_level is not None:
+        clauses.append('level <= ?')
+        params.append(max_level)
+    if in_party is True:
+        clauses.append('party_slot IS NOT NULL')
+    elif in_party is False:
+        clauses.append('party_slot IS NULL')
+    return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+
+class RosterStore:
+    def __init__(self, path=ROSTER_DB):
+        """
+        :param path: database file, or ':memory:' for a throwaway store
+        """
+        self.path = path
+        self._depth = 0
+        self.conn = sqlite3.connect(path)
+        # WAL keeps readers off the writer's back; NORMAL sync is still
+        # crash-safe in WAL mode and much cheaper than FULL
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        with self.conn:
+            self.conn.executescript(_SCHEMA)
+            self.conn.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group several writes into one transaction; rolled back on error.
+        Nested calls join the outermost transaction.
+        """
+        self._depth += 1
+        try:
+            if self._depth > 1:
+                yield self
+            else:
+                with self.conn:
+                    yield self
+        finally:
+            self._depth -= 1
+
+    # --- Writes ---
+    def add_units(self, units):
+        """Insert units in one transaction; returns their new IDs."""
+        ids = []
+        with self.transaction():
+            for unit in units:
+                ids.append(self.conn.execute(_INSERT, _row(unit)).lastrowid)
+        return ids
+
+    def update_units(self, pairs):
+        """Write back changed units, given (unit_id, Unit) pairs, in one transaction."""
+        with self.transaction():
+            self.conn.executemany(_UPDATE, [_row(unit) + (unit_id,) for unit_id, unit in pairs])
+
+    def update_unit(self, unit_id, unit):
+        self.update_units([(unit_id, unit)])
+
+    def remove_units(self, unit_ids):
+        with self.transaction():
+            self.conn.executemany('DELETE FROM units WHERE id = ?', [(i,) for i in unit_ids])
+
+    def replace_roster(self, units, upgrades=None, party=()):
+        """
+        Swap the whole roster (and optionally the upgrades) in one transaction.
+
+        :param party: indices into units of the selected battle party
+        :return: the new unit IDs, in the order of units
+        """
+        with self.transaction():
+            self.conn.execute('DELETE FROM units')
+            ids = [self.conn.execute(_INSERT, _row(unit)).lastrowid for unit in units]
+            self._set_party([ids[k] for k in party])
+            if upgrades is not None:
+                self._set_upgrades(upgrades)
+        return ids
+
+    def set_party(self, unit_ids):
+        """Make unit_ids (in slot order) the battle party."""
+        with self.transaction():
+            self._set_party(unit_ids)
+
+    def _set_party(self, unit_ids):
+        self.conn.execute('UPDATE units SET party_slot = NULL WHERE party_slot IS NOT NULL')
+        self.conn.executemany('UPDATE units SET party_slot = ? WHERE id = ?',
+                              [(slot, unit_id) for slot, unit_id in enumerate(unit_ids)])
+
+    def set_upgrades(self, upgrades):
+        with self.transaction():
+            self._set_upgrades(upgrades)
+
+    def _set_upgrades(self, upgrades):
+        self.conn.execute('DELETE FROM upgrades')
+        self.conn.executemany('INSERT INTO upgrades (key, value) VALUES (?, ?)',
+                              [(k, json.dumps(v)) for k, v in upgrades.items()])
+
+    def set_upgrade(self, key, value):
+        with self.transaction():
+            self.conn.execute('INSERT OR REPLACE INTO upgrades (key, value) VALUES (?, ?)',
+                              (key, json.dumps(value)))
+
+    # --- Reads ---
+    def get_unit(self, unit_id):
+        row = self.conn.execute(_SELECT + ' WHERE id = ?', (unit_id,)).fetchone()
+        return _unit(row) if row is not None else None
+
+    def count(self, **filters):
+        """Number of units matching the filters (see query)."""
+        where, params = _where(**filters)
+        return self.conn.execute('SELECT COUNT(*) FROM units' + where, params).fetchone()[0]
+
+    def query(self, unit_type=None, min_level=None, max_level=None, in_party=None,
+              order_by='id', descending=False, limit=None, offset=0):
+        """
+        Units matching all given filters, as (unit_id, Unit) pairs.
+
+        :param unit_type: only this unit type
+        :param min_level, max_level: inclusive level bounds
+        :param in_party: True for party members only, False to exclude them
+        :param order_by: one of ORDERINGS
+        """
+        if order_by not in ORDERINGS:
+            raise ValueError(f"Unknown ordering {order_by!r}")
+        where, params = _where(unit_type, min_level, max_level, in_party)
+        order = ORDERINGS[order_by]
+        if descending:
+            order = ', '.join(f'{key} DESC' for key in order.split(', '))
+        sql = f'{_SELECT}{where} ORDER BY {order}'
+        if limit is not None:
+            sql += ' LIMIT ? OFFSET ?'
+            params += [limit, offset]
+        return [(row[0], _unit(row)) for row in self.conn.execute(sql, params)]
+
+    def page(self, number, size=20, **options):
+        """
+        One page of query results.
+
+        :param number: zero-based page number
+        :param size: units per page
+        :param options: filters and ordering, as for query
+        """
+        filters = {k: options[k] for k in ('unit_type', 'min_level', 'max_level', 'in_party') if k in options}
+        units = self.query(limit=size, offset=number * size, **options)
+        return RosterPage(units, self.count(**filters), number, size)
+
+    def entries(self, **filters):
+        """(unit_id, name, unit_type, level) for matching units, without building Units."""
+        where, params = _where(**filters)
+        return self.conn.execute('SELECT id, name, unit_type, level FROM units' + where + ' ORDER BY id',
+                                 params).fetchall()
+
+    def party(self):
+        """(unit_id, Unit) pairs of the battle party, in slot order."""
+        return self.query(in_party=True, order_by='party')
+
+    def unit_types(self):
+        """{unit_type: count} for the whole roster."""
+        return dict(self.conn.execute('SELECT unit_type, COUNT(*) FROM units GROUP BY unit_type'))
+
+    def get_upgrades(self):
+        return {k: json.loads(v) for k, v in self.conn.execute('SELECT key, value FROM upgrades')}
+
+    # --- Migration ---
+    def import_save(self, filename):
+        """Copy a save file (binary or JSON) into this store, replacing its roster."""
+        units, upgrades, _ = load_save(filename)
+        upgrades = Section(section_path(filename, 'upgrades'), 'upgrades').read(upgrades)
+        party = Section(section_path(filename, 'party'), 'party').read([])
+        return self.replace_roster(units or [], upgrades, party)
+
+    def export_roster(self):
+        """(units, upgrades, party indices) in the shape SaveRepository works with."""
+        pairs = self.query()
+        index = {unit_id: k for k, (unit_id, _) in enumerate(pairs)}
+        party = [index[unit_id] for unit_id, _ in self.party()]
+        return [unit for _, unit in pairs], self.get_upgrades(), party
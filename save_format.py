@@ -0,0 +1,232 @@
+# save_format.py
+# Compact, versioned binary save format with lazy unit decoding.
+#
+# Layout (all little-endian):
+#   header   magic 'SWSB', version, unit count, offsets of the string table,
+#            unit index and upgrades block
+#   units    one record per unit: fixed-width stats plus interned ability and
+#            trait IDs; the 5x5 evolution grid is a 25-bit mask
+#   strings  interned strings (names, unit types, die faces, ability/trait IDs)
+#   index    per unit: record offset, name ID, type ID and level, so a roster
+#            can be listed without decoding a single record
+#   meta     compact JSON: small bookkeeping such as the journal epoch, and
+#            the village upgrades passed to encode_save
+#
+# Unit records hold base stats and abilities, without tile effects.
+
+import json
+import struct
+from collections.abc import Sequence
+
+from evolution_grid import GRID_SIZE, tiles_to_mask, mask_to_tiles
+
+MAGIC = b'SWSB'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sHHIIII')       # magic, version, reserved, count, strings, index, meta
+_RECORD = struct.Struct('<IHHII6hBIIBB')   # name, type, die, level, xp, 6 stats, pos, unlocked, available, n_abil, n_trait
+_INDEX = struct.Struct('<IIHI')            # offset, name, type, level
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+
+
+def is_binary_save(head):
+    """True if the first bytes of a file are a binary save header."""
+    return head[:4] == MAGIC
+
+
+class StringTable:
+    """Assigns each distinct string a small integer ID."""
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def intern(self, text):
+        sid = self.ids.get(text)
+        if sid is None:
+            sid = self.ids[text] = len(self.strings)
+            self.strings.append(text)
+        return sid
+
+    def encode(self):
+        parts = [_U32.pack(len(self.strings))]
+        for text in self.strings:
+            raw = text.encode('utf-8')
+            parts.append(_U16.pack(len(raw)))
+            parts.append(raw)
+        return b''.join(parts)
+
+
+def decode_strings(buf, offset):
+    (count,) = _U32.unpack_from(buf, offset)
+    offset += 4
+    strings = []
+    for _ in range(count):
+        (length,) = _U16.unpack_from(buf, offset)
+        offset += 2
+        strings.append(bytes(buf[offset:offset + length]).decode('utf-8'))
+        offset += length
+    return strings
+
+
+class RawUnit:
+    """An undecoded record from a loaded save, re-emitted without building a Unit."""
+    __slots__ = ('buf', 'offset', 'strings')
+
+    def __init__(self, buf, offset, strings):
+        self.buf = buf
+        self.offset = offset
+        self.strings = strings
+
+    @property
+    def level(self):
+        return _RECORD.unpack_from(self.buf, self.offset)[3]
+
+
+def _encode_dict(data, table):
+    pos = data.get('evolution_position', (2, 2))
+    abilities = data.get('abilities', [])
+    traits = data.get('traits', [])
+    record = _RECORD.pack(
+        table.intern(data['name']),
+        table.intern(data['unit_type']),
+        table.intern(','.join(data.get('die_faces', []))),
+        data.get('level', 1),
+        data.get('xp', 0),
+        data.get('hp', 0), data.get('atk', 0), data.get('def_', 0),
+        data.get('mov', 0), data.get('rng', 0), data.get('current_hp', 0),
+        pos[0] * GRID_SIZE + pos[1],
+        tiles_to_mask(data.get('unlocked_tiles', [(2, 2)])),
+        tiles_to_mask(data.get('available_tiles', [])),
+        len(abilities),
+        len(traits),
+    )
+    ids = [table.intern(a) for a in abilities] + [table.intern(t) for t in traits]
+    return record + struct.pack(f'<{len(ids)}H', *ids), record
+
+
+def _encode_raw(raw, table):
+    # Remap the record's string IDs from its source table into the new one
+    fields = list(_RECORD.unpack_from(raw.buf, raw.offset))
+    for k in (0, 1, 2):
+        fields[k] = table.intern(raw.strings[fields[k]])
+    count = fields[-2] + fields[-1]
+    ids = struct.unpack_from(f'<{count}H', raw.buf, raw.offset + _RECORD.size)
+    record = _RECORD.pack(*fields)
+    ids = [table.intern(raw.strings[i]) for i in ids]
+    return record + struct.pack(f'<{count}H', *ids), record
+
+
+def encode_save(units, upgrades, meta=None):
+    """
+    Serialize a save to bytes.
+
+    :param units: iterable of unit dicts (Unit.to_dict()) or RawUnit records
+    :param upgrades: dict of village upgrades
+    :param meta: optional dict of extra JSON-safe fields (journal epoch)
+    """
+    table = StringTable()
+    body = []
+    index = []
+    offset = _HEADER.size
+    for unit in units:
+        if isinstance(unit, RawUnit):
+            blob, record = _encode_raw(unit, table)
+        else:
+            blob, record = _encode_dict(unit, table)
+        name_id, type_id, _, level = _RECORD.unpack_from(record)[:4]
+        index.append(_INDEX.pack(offset, name_id, type_id, level))
+        body.append(blob)
+        offset += len(blob)
+    strings_offset = offset
+    strings = table.encode()
+    index_offset = strings_offset + len(strings)
+    index_blob = b''.join(index)
+    meta_offset = index_offset + len(index_blob)
+    meta = dict(meta or {}, upgrades=upgrades)
+    meta_raw = json.dumps(meta, separators=(',', ':')).encode('utf-8')
+    header = _HEADER.pack(MAGIC, VERSION, 0, len(index), strings_offset, index_offset, meta_offset)
+    return b''.join([header] + body + [strings, index_blob, _U32.pack(len(meta_raw)), meta_raw])
+
+
+def decode_record(buf, offset, strings):
+    """Decode one unit record into the dict form Unit.from_dict accepts."""
+    (name_id, type_id, die_id, level, xp, hp, atk, def_, mov, rng, current_hp,
+     pos, unlocked, available, n_abilities, n_traits) = _RECORD.unpack_from(buf, offset)
+    ids = struct.unpack_from(f'<{n_abilities + n_traits}H', buf, offset + _RECORD.size)
+    die = strings[die_id]
+    return {
+        'name': strings[name_id],
+        'unit_type': strings[type_id],
+        'level': level,
+        'xp': xp,
+        'hp': hp,
+        'atk': atk,
+        'def_': def_,
+        'mov': mov,
+        'rng': rng,
+        'current_hp': current_hp,
+        'die_faces': die.split(',') if die else [],
+        'evolution_position': divmod(pos, GRID_SIZE),
+        'unlocked_tiles': mask_to_tiles(unlocked),
+        'available_tiles': mask_to_tiles(available),
+        'abilities': [strings[i] for i in ids[:n_abilities]],
+        'traits': [strings[i] for i in ids[n_abilities:]],
+    }
+
+
+class LazyRoster(Sequence):
+    """
+    Roster backed by a binary save. Units are decoded on first access and
+    then cached, so edits to a decoded Unit stick; untouched units are written
+    back from their raw records.
+    """
+    def __init__(self, buf, unit_factory):
+        magic, version, _, count, strings_offset, index_offset, meta_offset = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a binary save")
+        if version != VERSION:
+            raise ValueError(f"Unsupported save version {version} (expected {VERSION})")
+        self.buf = buf
+        self.unit_factory = unit_factory
+        self.strings = decode_strings(buf, strings_offset)
+        self._index = list(_INDEX.iter_unpack(buf[index_offset:index_offset + count * _INDEX.size]))
+        self._units = [None] * count
+        (length,) = _U32.unpack_from(buf, meta_offset)
+        meta = json.loads(bytes(buf[meta_offset + 4:meta_offset + 4 + length]).decode('utf-8'))
+        self.upgrades = meta.pop('upgrades', {})
+        self.meta = meta
+
+    def __len__(self):
+        return len(self._units)
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [self[i] for i in range(*k.indices(len(self)))]
+        unit = self._units[k]
+        if unit is None:
+            offset = self._index[k][0]
+            unit = self._units[k] = self.unit_factory(decode_record(self.buf, offset, self.strings))
+        return unit
+
+    def entries(self):
+        """(name, unit_type, level) for every unit, straight from the index."""
+        return [(self.strings[name], self.strings[utype], level) for _, name, utype, level in self._index]
+
+    def is_decoded(self, k):
+        return self._units[k] is not None
+
+    def index_of(self, unit):
+        """Position of an already decoded Unit, without decoding anything else."""
+        for k, decoded in enumerate(self._units):
+            if decoded is unit:
+                return k
+        raise ValueError(f"{unit!r} is not in this roster")
+
+    def payload_items(self):
+        """Unit dicts for decoded units, RawUnit records for the rest."""
+        for k, unit in enumerate(self._units):
+            if unit is None:
+                yield RawUnit(self.buf, self._index[k][0], self.strings)
+            else:
+                yield unit.to_dict()
@@ -0,0 +1,111 @@
+# save_journal.py
+# Append-only journal of small save mutations.
+#
+# Each roster change (XP gained, tile unlocked) is one compact JSON line
+# appended to savegame.sav.journal.<epoch>. Appends are buffered and written
+# with a single write + fsync per batch. On load the journals are
+# replayed on top of the last snapshot; compaction writes a fresh snapshot and
+# starts a new epoch so old journal files can be deleted.
+
+import glob
+import json
+import os
+import threading
+
+
+def journal_path(save_file, epoch):
+    return f"{save_file}.journal.{epoch}"
+
+
+def journal_epochs(save_file):
+    """Epoch numbers of the journal files that exist for save_file, oldest first."""
+    epochs = []
+    for path in glob.glob(glob.escape(save_file) + '.journal.*'):
+        suffix = path.rsplit('.', 1)[1]
+        if suffix.isdigit():
+            epochs.append(int(suffix))
+    return sorted(epochs)
+
+
+def read_journal(path):
+    """Return the records in a journal file; a torn final line is ignored."""
+    records = []
+    try:
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Crash mid-append: drop the partial record
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+    except OSError:
+        pass
+    return records
+
+
+def remove_journals(save_file, before_epoch):
+    """Delete journal files older than before_epoch (already in a snapshot)."""
+    for epoch in journal_epochs(save_file):
+        if epoch < before_epoch:
+            try:
+                os.remove(journal_path(save_file, epoch))
+            except OSError:
+                pass
+
+
+class MutationJournal:
+    def __init__(self, save_file, epoch=0, batch_delay=0.2):
+        """
+        :param save_file: the snapshot file this journal belongs to
+        :param epoch: journal file to append to
+        :param batch_delay: seconds to gather appends before one write + fsync
+        """
+        self.save_file = save_file
+        self.epoch = epoch
+        self.batch_delay = batch_delay
+        self.records = 0          # Records in the current epoch
+        self.bytes = 0            # Bytes in the current epoch
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._timer = None
+        path = journal_path(save_file, epoch)
+        if os.path.exists(path):
+            self.records = len(read_journal(path))
+            self.bytes = os.path.getsize(path)
+
+    def append(self, record):
+        """Queue one record; it reaches disk with the next batch."""
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        with self._lock:
+            self._buffer.append(line)
+            self.records += 1
+            self.bytes += len(line)
+            if self._timer is None:
+                self._timer = threading.Timer(self.batch_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Write and fsync everything buffered so far."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._buffer:
+                return
+            data = ''.join(self._buffer).encode('utf-8')
+            self._buffer = []
+            with open(journal_path(self.save_file, self.epoch), 'ab') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def rotate(self):
+        """Flush, then start appending to a new epoch; returns the new epoch."""
+        self.flush()
+        with self._lock:
+            self.epoch += 1
+            self.records = 0
+            self.bytes = 0
+        return self.epoch
@@ -0,0 +1,365 @@
+# save_repository.py
+# Process-wide, in-memory view of the save file.
+#
+# Screens used to call load_army() whenever they needed units or upgrades,
+# re-reading and re-parsing the save file each time. The repository loads the
+# file once, serves everything from memory and only goes back to disk when the
+# file's modification time shows someone else changed it.
+#
+# Small roster changes (XP, tile unlocks) are appended to a mutation journal
+# instead of rewriting the save, so their cost does not grow with the roster. Once the journal gets long it is compacted into a fresh
+# snapshot on the background saver. Upgrades, the party and the settings are
+# separate save sections (see save_sections.py) written on their own.
+
+import os
+import threading
+import time
+
+from autosave import WriteBehindSaver
+from game_data import XP_CURVE
+from save_format import LazyRoster
+from save_journal import MutationJournal, journal_epochs, journal_path, read_journal, remove_journals
+from save_sections import SETTINGS_FILE, Section, section_path
+from save_slots import DEFAULT_SLOT, slot_index
+from unit_data import SAVE_FILE, army_payload, write_save_data, load_save, create_mock_roster
+
+COMPACT_RECORDS = 500       # Journal records before compacting into a snapshot
+COMPACT_BYTES = 64 * 1024   # ...or journal size in bytes
+
+
+def highest_level(units):
+    """Highest unit level in a roster; a lazy roster answers from its index."""
+    if units is None:
+        return 0
+    if isinstance(units, LazyRoster):
+        return max((level for _, _, level in units.entries()), default=0)
+    return max((u.level for u in units), default=0)
+
+
+class SaveRepository:
+    def __init__(self, filename=SAVE_FILE, slot=DEFAULT_SLOT, settings_file=SETTINGS_FILE):
+        self.filename = filename
+        self.slot = slot       # Name of the save slot filename belongs to
+        self.units = None      # List of Unit, or None when there is no save yet
+        self.upgrades = {}     # Village upgrade flags
+        self.party = []        # Roster indices of the selected battle party
+        self.dirty = False     # In-memory changes that are in neither snapshot nor journal
+        self._snapshot_pending = False  # A queued snapshot already holds the dirty changes
+        self._settings = Section(settings_file, 'settings')
+        self.settings = self._settings.read({})   # Shared by every slot
+        self.autosave_enabled = self.settings.get('autosave', True)
+        self._loaded = False
+        self._mtime = None
+        self._generation = 0   # Bumped on every change; tells stale writes apart
+        self._index_cache = {}
+        self._header_stale = False  # Journaled changes the slot header does not show yet
+        # Guards dirty, _snapshot_pending, _generation and _mtime, which the
+        # saver thread updates after each background write
+        self._lock = threading.Lock()
+        self._highest_level = 0     # Kept up to date for the slot header as XP comes in
+        self._journal = MutationJournal(filename)
+        self._open_sections()
+        self._saver = WriteBehindSaver(self._write)
+
+    def _open_sections(self):
+        self._sections = {name: Section(section_path(self.filename, name), name)
+                          for name in ('upgrades', 'party')}
+        self._unsaved_sections = set()  # Changed while auto-save was off
+
+    def _disk_mtime(self):
+        try:
+            return os.stat(self.filename).st_mtime_ns
+        except OSError:
+            return None
+
+    def _refresh(self):
+        """Load on first use, and again if the file changed behind our back."""
+        if not self._loaded:
+            self.reload()
+        else:
+            with self._lock:
+                stale = not self.dirty and not self._saver.pending and self._disk_mtime() != self._mtime
+            if stale:
+                self.reload()
+
+    def reload(self):
+        """Discard in-memory state, read the snapshot and replay its journal."""
+        self._journal.flush()
+        with self._lock:
+            self._mtime = self._disk_mtime()
+        units, upgrades, meta = load_save(self.filename)
+        self.units = units
+        self._index_cache = {}
+        self._highest_level = highest_level(units)  # Replayed XP below raises it
+
+        # JSON saves kept the upgrades inside the save file; use those until
+        # the upgrades section has been written once
+        self.upgrades = self._sections['upgrades'].read(None)
+        if self.upgrades is None:
+            self.upgrades = upgrades if upgrades is not None else {}
+            if self.upgrades:
+                self._sections['upgrades'].write(self.upgrades)
+        self.party = self._sections['party'].read([])
+        self._unsaved_sections = set()
+
+        # Replay every journal written since the snapshot; older ones are stale
+        epoch = meta.get('journal_epoch', 0)
+        epochs = [e for e in journal_epochs(self.filename) if e >= epoch]
+        if units is not None:
+            for e in epochs:
+                for record in read_journal(journal_path(self.filename, e)):
+                    self._apply(record)
+        remove_journals(self.filename, epoch)
+        self._journal = MutationJournal(self.filename, max(epochs + [epoch]))
+
+        with self._lock:
+            self.dirty = False
+            self._snapshot_pending = False
+        self._loaded = True
+
+    def use_slot(self, slot):
+        """Switch to another save slot; pending changes go to the current one first."""
+        self.flush()
+        self.slot = slot
+        self.filename = slot_index.file_for(slot)
+        self.units = None
+        self.upgrades = {}
+        self.party = []
+        with self._lock:
+            self.dirty = False
+            self._snapshot_pending = False
+        self._loaded = False
+        self._index_cache = {}
+        self._journal = MutationJournal(self.filename)
+        self._open_sections()
+
+    def get_units(self):
+        """The saved roster (shared list, not a copy), or None if nothing is saved."""
+        self._refresh()
+        return self.units
+
+    def get_upgrades(self):
+        """The saved village upgrades (shared dict, not a copy)."""
+        self._refresh()
+        return self.upgrades
+
+    def get_party_units(self):
+        """Units of the saved battle party."""
+        self._refresh()
+        if self.units is None:
+            return []
+        return [self.units[k] for k in self.party if k < len(self.units)]
+
+    def set_units(self, units):
+        self._refresh()
+        self.units = units
+        self._index_cache = {}
+        self._highest_level = highest_level(units)
+        self.mark_dirty()
+
+    def set_upgrades(self, upgrades, persist=None):
+        self._refresh()
+        self.upgrades = upgrades
+        self._write_section('upgrades', persist)
+
+    def mark_dirty(self):
+        """Call after mutating units returned by the getters."""
+        with self._lock:
+            self.dirty = True
+            self._generation += 1
+            self._snapshot_pending = False  # Not in the queued snapshot, if any
+
+    # --- Journaled mutations ---
+    # persist=None follows the Auto-save setting; True always records the
+    # change, False only applies it in memory until the next save.
+    def add_xp(self, unit, amount, persist=None):
+        unit.add_xp(amount)
+        self._note_levels([unit])
+        self._record(['add_xp', self._index_of(unit), amount], persist)
+
+    def add_xp_many(self, units, amount, persist=None):
+        """Give several units the same XP as one journal record (e.g. after a battle)."""
+        XP_CURVE.award(units, amount)
+        self._note_levels(units)
+        self._record(['add_xp_many', [self._index_of(u) for u in units], amount], persist)
+
+    def unlock_tile(self, unit, pos, persist=None):
+        unit.unlock_tile(pos)
+        self._record(['unlock_tile', self._index_of(unit), pos[0], pos[1]], persist)
+
+    # --- Sections ---
+    def set_party(self, units, persist=None):
+        self._refresh()
+        self.party = [self._index_of(u) for u in units]
+        self._write_section('party', persist)
+
+    def set_upgrade(self, key, value, persist=None):
+        self._refresh()
+        self.upgrades[key] = value
+        self._write_section('upgrades', persist)
+
+    def get_setting(self, key, default=None):
+        return self.settings.get(key, default)
+
+    def set_setting(self, key, value):
+        """Store one setting; settings are written right away whatever the Auto-save state."""
+        self.settings[key] = value
+        self._settings.write(self.settings)
+
+    def _write_section(self, name, persist=None):
+        if persist is None:
+            persist = self.autosave_enabled
+        if not persist:
+            self._unsaved_sections.add(name)
+            return
+        self._unsaved_sections.discard(name)
+        if name == 'upgrades':
+            self._sections['upgrades'].write(self.upgrades)
+            slot_index.update(self.slot, upgrades=self.upgrades)
+        else:
+            self._sections['party'].write(self.party)
+
+    def _apply(self, record):
+        """Replay one journal record onto the in-memory state."""
+        op = record[0]
+        if op == 'add_xp':
+            unit = self.units[record[1]]
+            unit.add_xp(record[2])
+            self._note_levels([unit])
+        elif op == 'add_xp_many':
+            units = [self.units[k] for k in record[1]]
+            XP_CURVE.award(units, record[2])
+            self._note_levels(units)
+        elif op == 'unlock_tile':
+            self.units[record[1]].unlock_tile((record[2], record[3]))
+
+    def _note_levels(self, units):
+        for unit in units:
+            if unit.level > self._highest_level:
+                self._highest_level = unit.level
+
+    def _record(self, record, persist):
+        if persist is None:
+            persist = self.autosave_enabled
+        if not persist:
+            self.mark_dirty()
+            return
+        with self._lock:
+            needs_snapshot = not self._snapshot_pending and (self.dirty or self._mtime is None)
+        if needs_snapshot:
+            # The journal only describes changes on top of a snapshot; without
+            # one (or with other unsaved edits) queue a full snapshot. Until it
+            # is written, later changes go to the new epoch's journal.
+            self.mark_dirty()
+            self._compact()
+            return
+        self._journal.append(record)
+        self._header_stale = True
+        if self._journal.records >= COMPACT_RECORDS or self._journal.bytes >= COMPACT_BYTES:
+            self._compact()
+
+    def _index_of(self, unit):
+        self._refresh()
+        if self.units is None:
+            self.units = create_mock_roster()
+            self._highest_level = highest_level(self.units)
+        k = self._index_cache.get(id(unit))
+        if k is not None and k < len(self.units) and self._peek(k) is unit:
+            return k
+        if isinstance(self.units, LazyRoster):
+            k = self.units.index_of(unit)
+        else:
+            k = next((i for i, u in enumerate(self.units) if u is unit), None)
+            if k is None:
+                raise ValueError(f"{unit.name} is not in the saved roster")
+        self._index_cache[id(unit)] = k
+        return k
+
+    def _peek(self, k):
+        if isinstance(self.units, LazyRoster) and not self.units.is_decoded(k):
+            return None
+        return self.units[k]
+
+    # --- Snapshots ---
+    def _payload(self, epoch):
+        units = self.units
+        if units is None:
+            units = self.units = create_mock_roster()
+            self._highest_level = highest_level(units)
+        # Upgrades and party live in their own sections, not in the snapshot;
+        # a copy of the upgrades rides along for the slot header
+        meta = {'journal_epoch': epoch}
+        return self._generation, epoch, army_payload(units, None, meta), dict(self.upgrades)
+
+    def _write(self, payload):
+        generation, epoch, data, upgrades = payload
+        directory = os.path.dirname(self.filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        write_save_data(data, self.filename)
+        slot_index.record(self.slot, self.filename, data['units'], upgrades)
+        remove_journals(self.filename, epoch)
+        # Runs on the saver thread while the UI thread keeps changing the state
+        mtime = self._disk_mtime()
+        with self._lock:
+            self._mtime = mtime
+            if generation == self._generation:
+                self.dirty = False
+                self._snapshot_pending = False
+
+    def _compact(self):
+        """Start a new journal epoch and snapshot everything up to it in the background."""
+        epoch = self._journal.rotate()
+        payload = self._payload(epoch)
+        with self._lock:
+            self._snapshot_pending = True
+        self._header_stale = False  # The snapshot's header shows everything so far
+        self._saver.schedule(payload)
+
+    def request_save(self):
+        """
+        Mark the state changed and, if auto-save is on, queue a background save.
+
+        The payload is captured now (cheap dict building); encoding and the
+        atomic file write happen later on the saver thread, and bursts of
+        requests collapse into a single write.
+        """
+        self.mark_dirty()
+        if self.autosave_enabled:
+            self._compact()
+
+    def set_autosave(self, enabled):
+        """Turn write-behind auto-save on or off; turning it on saves pending changes."""
+        self.autosave_enabled = enabled
+        self.set_setting('autosave', enabled)
+        if enabled:
+            for name in list(self._unsaved_sections):
+                self._write_section(name, True)
+            if self.dirty:
+                self._compact()
+
+    def flush(self):
+        """Block until journaled changes and queued auto-saves are on disk (app pause/stop)."""
+        self._journal.flush()
+        self._saver.flush()
+        if self._header_stale and self.units is not None:
+            # Journaled XP would otherwise only reach the slot picker at the
+            # next compaction; the numbers are tracked as changes come in, so
+            # this does not walk the roster
+            slot_index.update(self.slot, roster_size=len(self.units),
+                              highest_level=self._highest_level, saved_at=time.time())
+            self._header_stale = False
+
+    def save(self):
+        """Write a full snapshot and every section to disk now."""
+        self._refresh()
+        self._saver.cancel()
+        self._saver.flush()
+        self._write(self._payload(self._journal.rotate()))
+        self._header_stale = False
+        for name in self._sections:
+            self._write_section(name, True)
+
+
+# Global save repository instance
+save_repository = SaveRepository()
@@ -0,0 +1,77 @@
+# save_sections.py
+# Small, independently versioned parts of a save.
+#
+# The roster is the big part of a save and lives in the binary snapshot plus
+# its journal. Village upgrades, the party selection and the settings are tiny
+# and change on their own, so each is kept in a separate section file next to
+# the save (savegame.sav.upgrades, savegame.sav.party, settings.dat). Writing
+# one section never touches the others, so unlocking an upgrade or flipping a
+# setting costs a few hundred bytes however large the army is.
+#
+# A section file is compact JSON: {"schema": s, "rev": r, "data": ...}. The
+# schema number versions the layout of data; rev counts writes.
+
+import json
+import os
+
+SETTINGS_FILE = 'settings.dat'
+
+# Current schema of each section's data
+SCHEMAS = {
+    'upgrades': 1,   # {upgrade_key: value}
+    'party': 1,      # [roster index, ...] in slot order
+    'settings': 1,   # {setting_key: value}
+}
+
+
+def section_path(save_file, name):
+    return f"{save_file}.{name}"
+
+
+class Section:
+    def __init__(self, path, name):
+        """
+        :param path: file holding this section
+        :param name: key into SCHEMAS
+        """
+        self.path = path
+        self.name = name
+        self.schema = SCHEMAS[name]
+        self.rev = 0
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def read(self, default=None):
+        """Return the section's data, or default if it has not been written yet."""
+        try:
+            with open(self.path, 'rb') as f:
+                doc = json.loads(f.read().decode('utf-8'))
+        except (OSError, ValueError):
+            return default
+        if doc.get('schema', 1) > self.schema:
+            raise ValueError(f"{self.name} section schema {doc['schema']} is newer than supported {self.schema}")
+        self.rev = doc.get('rev', 0)
+        return doc.get('data', default)
+
+    def write(self, data):
+        """Atomically replace the section (temp file, fsync, rename)."""
+        self.rev += 1
+        raw = json.dumps({'schema': self.schema, 'rev': self.rev, 'data': data},
+                         separators=(',', ':')).encode('utf-8')
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_name = self.path + '.tmp'
+        with open(tmp_name, 'wb') as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, self.path)
+        return len(raw)
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,173 @@
+# save_slots.py
+# Named save slots and a small header index for the slot picker.
+#
+# Each slot is its own save file (plus journal). Next to them, saves/slots.json
+# keeps one short header per slot (name, save time, roster size, highest level,
+# unlocked upgrades), so a picker can list every slot by reading one small file
+# instead of opening each save. A header is rewritten whenever its slot is
+# snapshotted, and rebuilt from the save's unit index (no unit decoding) if
+# the save file changed without it.
+
+import json
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+
+from save_format import LazyRoster
+from save_sections import Section, section_path
+from unit_data import SAVE_FILE, load_save
+
+SAVE_DIR = 'saves'
+INDEX_FILE = os.path.join(SAVE_DIR, 'slots.json')
+DEFAULT_SLOT = 'default'   # The original single save, kept at SAVE_FILE
+
+SlotHeader = namedtuple('SlotHeader', 'name saved_at roster_size highest_level upgrades')
+
+
+def slot_file(name, save_dir=SAVE_DIR):
+    """Save file backing the named slot."""
+    if name == DEFAULT_SLOT:
+        return SAVE_FILE
+    safe = re.sub(r'[^A-Za-z0-9_-]+', '_', name).strip('_') or 'slot'
+    return os.path.join(save_dir, safe + '.sav')
+
+
+def summarize(units, upgrades):
+    """Header fields for a roster; units may be dicts, Units or RawUnit records."""
+    levels = [u['level'] if isinstance(u, dict) else u.level for u in units]
+    return {
+        'roster_size': len(levels),
+        'highest_level': max(levels, default=0),
+        'upgrades': sorted(k for k, v in (upgrades or {}).items() if v),
+    }
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class SlotIndex:
+    def __init__(self, path=INDEX_FILE):
+        self.path = path
+        self.save_dir = os.path.dirname(path) or '.'
+        self._lock = threading.Lock()
+        self._entries = None
+        self._mtime = None
+
+    def _load(self):
+        # Caller holds the lock
+        mtime = _mtime(self.path)
+        if self._entries is None or mtime != self._mtime:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+            self._mtime = mtime
+        return self._entries
+
+    def _store(self):
+        # Caller holds the lock; same temp-file + rename as the saves
+        os.makedirs(self.save_dir, exist_ok=True)
+        tmp_name = self.path + '.tmp'
+        with open(tmp_name, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, self.path)
+        self._mtime = _mtime(self.path)
+
+    def file_for(self, name):
+        with self._lock:
+            entry = self._load().get(name)
+        return entry['file'] if entry else slot_file(name, self.save_dir)
+
+    def record(self, name, filename, units, upgrades, saved_at=None):
+        """Update a slot's header right after its save file was written."""
+        entry = summarize(units, upgrades)
+        entry.update(file=filename, saved_at=saved_at or time.time(), mtime=_mtime(filename))
+        with self._lock:
+            self._load()[name] = entry
+            self._store()
+
+    def update(self, name, upgrades=None, roster_size=None, highest_level=None, saved_at=None):
+        """Refresh parts of an already indexed slot's header; None leaves a field as it is."""
+        with self._lock:
+            entry = self._load().get(name)
+            if entry is None:
+                return
+            if upgrades is not None:
+                entry['upgrades'] = sorted(k for k, v in upgrades.items() if v)
+            if roster_size is not None:
+                entry['roster_size'] = roster_size
+            if highest_level is not None:
+                entry['highest_level'] = highest_level
+            if saved_at is not None:
+                entry['saved_at'] = saved_at
+            self._store()
+
+    def remove(self, name):
+        """Forget a slot and delete its save file."""
+        with self._lock:
+            entry = self._load().pop(name, None)
+            self._store()
+        if entry:
+            try:
+                os.remove(entry['file'])
+            except OSError:
+                pass
+            for section in ('upgrades', 'party'):
+                Section(section_path(entry['file'], section), section).remove()
+
+    def _rebuild(self, name, filename):
+        """Header for a save written without one, from its unit index only."""
+        units, upgrades, _ = load_save(filename)
+        if units is None:
+            return None
+        upgrades = Section(section_path(filename, 'upgrades'), 'upgrades').read(upgrades)
+        if isinstance(units, LazyRoster):
+            units = [{'level': level} for _, _, level in units.entries()]
+        entry = summarize(units, upgrades)
+        mtime = _mtime(filename)
+        entry.update(file=filename, saved_at=mtime / 1e9, mtime=mtime)
+        return entry
+
+    def list_slots(self):
+        """SlotHeader for every slot, most recently saved first."""
+        with self._lock:
+            entries = self._load()
+            changed = False
+            # Pick up saves the index does not know about yet
+            known = {e['file'] for e in entries.values()}
+            candidates = [(DEFAULT_SLOT, SAVE_FILE)]
+            if os.path.isdir(self.save_dir):
+                candidates += [(os.path.splitext(f)[0], os.path.join(self.save_dir, f))
+                               for f in os.listdir(self.save_dir) if f.endswith('.sav')]
+            for name, filename in candidates:
+                if filename not in known and name not in entries:
+                    entry = self._rebuild(name, filename)
+                    if entry:
+                        entries[name] = entry
+                        changed = True
+            for name, entry in list(entries.items()):
+                mtime = _mtime(entry['file'])
+                if mtime is None:
+                    del entries[name]
+                    changed = True
+                elif mtime != entry.get('mtime'):
+                    entries[name] = self._rebuild(name, entry['file']) or entry
+                    changed = True
+            if changed:
+                self._store()
+            headers = [SlotHeader(name, e['saved_at'], e['roster_size'], e['highest_level'], e['upgrades'])
+                       for name, e in entries.items()]
+        return sorted(headers, key=lambda h: h.saved_at, reverse=True)
+
+
+# Global slot index
+slot_index = SlotIndex()
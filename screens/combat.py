@@ -5,37 +5,17 @@ from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy.metrics import dp
 from kivy.uix.scrollview import ScrollView
-from kivy.uix.label import Label
-from kivy.uix.stacklayout import StackLayout
 from kivy.clock import Clock
 from kivy.utils import platform
-from kivy.core.window import Window
-from kivy.uix.popup import Popup
-import random
 
-import sys, os
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from unit_data import Unit, load_army, create_mock_roster
+from unit_data import Unit, create_mock_roster
 from game_state import game_state
-
-# --- Dice System ---
-class Die:
-    def __init__(self, faces=None):
-        # Default: balanced die
-        if faces is None:
-            faces = ['Sword', 'Sword', 'Shield', 'Shield', 'Pulse', 'Pulse']
-        self.faces = faces
-        self.sides = len(faces)
-    def roll(self):
-        return random.choice(self.faces)
-
-def roll_dice(num, unit=None):
-    """Roll dice for a unit using their specific die faces."""
-    if unit and hasattr(unit, 'die_faces'):
-        die = Die(unit.die_faces)
-    else:
-        die = Die()  # Default balanced die
-    return [die.roll() for _ in range(num)]
+from save_repository import save_repository
+from combat_rules import roll_dice
+from combat_log import CombatLog, DEFAULT_LOG_CAP
+from threat_map import ThreatMap
+from battle_snapshot import BattleSnapshot
+from perf_timings import timed
 
 class CombatScreen(Screen):
     def __init__(self, **kwargs):
@@ -58,6 +38,7 @@ class CombatScreen(Screen):
         self.selected = None
         self.move_tiles = set()  # Valid tiles the player can move to
         self.attack_tiles = set()  # Tiles the selected unit can attack
+        self.activation_snapshot = None  # Board before the current activation; Cancel returns to it
         self.current_turn = "player"
         self.active_side = "player"  # Alternates between 'player' and 'enemy'
         self.round_number = 1
@@ -140,7 +121,7 @@ class CombatScreen(Screen):
             size_hint_x=0.33,
             font_size=button_font
         )
-        clear_log_button.bind(on_release=lambda instance: self.combat_log_stack.clear_widgets())
+        clear_log_button.bind(on_release=lambda instance: self.clear_log())
         button_container.add_widget(clear_log_button)
         
         # Return to Village Button
@@ -167,24 +148,34 @@ class CombatScreen(Screen):
             size_hint_y=None,
             height=log_height
         )
-        self.combat_log_stack = BoxLayout(
-            orientation='vertical', 
-            size_hint_y=None, 
-            spacing=dp(2), 
-            padding=dp(4)
+        # The whole log is one label, re-rendered at most once per frame
+        self.combat_log = CombatLog(save_repository.get_setting('combat_log_cap', DEFAULT_LOG_CAP))
+        self.combat_log_label = Label(
+            text="",
+            size_hint_y=None,
+            font_size='14sp',
+            halign='left',
+            valign='top',
+            padding=(dp(4), dp(4))
         )
-        self.combat_log_stack.bind(minimum_height=self.combat_log_stack.setter('height'))
-        self.combat_log_container.add_widget(self.combat_log_stack)
+        self.combat_log_label.bind(width=lambda label, width: setattr(label, 'text_size', (width, None)))
+        self.combat_log_label.bind(texture_size=lambda label, size: setattr(label, 'height', size[1]))
+        self.combat_log_container.add_widget(self.combat_log_label)
+        self._log_trigger = Clock.create_trigger(self.render_log)
         self.layout.add_widget(self.combat_log_container)  
 
         self.add_widget(self.layout)
         self.build_grid()
         
     def on_enter(self):
-        # Always load the saved army and upgrades for battle
-        loaded_army, upgrades = load_army()
-        self.upgrades = upgrades if upgrades is not None else {}
-        if loaded_army:
+        # Always use the saved party and upgrades for battle; without a saved
+        # party, the first units of the army fight
+        loaded_army = save_repository.get_units()
+        self.upgrades = save_repository.get_upgrades()
+        party = save_repository.get_party_units()
+        if party:
+            game_state.selected_units = party
+        elif loaded_army:
             game_state.selected_units = loaded_army[:game_state.max_party_size]
         else:
             game_state.selected_units = create_mock_roster()[:game_state.max_party_size]
@@ -217,6 +208,7 @@ class CombatScreen(Screen):
         self.active_side = "player"
         self.activation_phase = None
         self.unit_being_activated = None
+        self.activation_snapshot = None
         self.player_pulse = 0
         self.enemy_pulse = 0
         self.round_label.text = f"Round {self.round_number}"
@@ -242,7 +234,8 @@ class CombatScreen(Screen):
             self.player_positions[default_unit] = (4, 2)
             self.player_positions[default_unit2] = (3, 2)
         else:
-            self.player_units = selected_units.copy()
+            # Fight with copies: battle damage must not reach the saved roster
+            self.player_units = [Unit.from_dict(unit.to_dict()) for unit in selected_units]
             # Assign positions to player units (bottom of grid)
             positions = [(4, 1), (4, 2), (4, 3), (3, 2)]  # Bottom row and one above
             for i, unit in enumerate(self.player_units):
@@ -287,6 +280,7 @@ class CombatScreen(Screen):
         
         return None, None
 
+    @timed('build_grid')
     def build_grid(self):
         self.grid.clear_widgets()
         tile_font = '16sp' if platform in ['android', 'ios'] else '14sp'
@@ -390,6 +384,8 @@ class CombatScreen(Screen):
         if self.activation_phase is None:
             # Start activation: select unit
             if unit_type == "player" and unit not in self.activated_player_units:
+                # The move is a what-if until the unit acts: Cancel restores this
+                self.activation_snapshot = self.snapshot()
                 self.selected = pos
                 self.unit_being_activated = unit
                 self.activation_phase = 'move'
@@ -498,6 +494,7 @@ class CombatScreen(Screen):
             self.selected = None
             self.unit_being_activated = None
             self.activation_phase = None
+            self.activation_snapshot = None
             self.move_tiles.clear()
             self.attack_tiles.clear()
             self.build_grid()
@@ -626,6 +623,7 @@ class CombatScreen(Screen):
         self.selected = None
         self.unit_being_activated = None
         self.activation_phase = None
+        self.activation_snapshot = None
         self.move_tiles.clear()
         self.attack_tiles.clear()
         self.build_grid()
@@ -640,10 +638,18 @@ class CombatScreen(Screen):
         self.pass_activation()
         
     def log(self, message):
-        """Add a message to the top of the combat log."""
-        label = Label(text=message, size_hint_y=None, height=dp(20), font_size='14sp', halign='left', valign='middle')
-        label.bind(size=label.setter('text_size'))  # Wrap long text
-        self.combat_log_stack.add_widget(label, index=0)  # Add at the top
+        """Add a message to the top of the combat log (shown on the next frame)."""
+        self.combat_log.append(message)
+        self._log_trigger()
+
+    def clear_log(self):
+        self.combat_log.clear()
+        self._log_trigger()
+
+    def render_log(self, *args):
+        """Show the buffered lines, newest first; all lines logged this frame in one update."""
+        if self.combat_log.dirty:
+            self.combat_log_label.text = self.combat_log.text()
 
     def pass_activation(self):
         # Called after a side activates a unit or passes
@@ -658,6 +664,7 @@ class CombatScreen(Screen):
         # Alternate to the other side if they have unactivated units
         if self.active_side == "player":
             if enemy_left:
+                self.close_activation()  # Nothing of the player's stays open into the enemy's turn
                 self.active_side = "enemy"
                 self.info_label.text = "Enemy's turn."
                 Clock.schedule_once(self.enemy_turn, 0.5)
@@ -670,84 +677,87 @@ class CombatScreen(Screen):
                 self.info_label.text = "Your turn."
             else:
                 # Player has no units left, enemy continues
+                self.close_activation()
                 self.active_side = "enemy"
                 Clock.schedule_once(self.enemy_turn, 0.5)
 
     def end_player_turn(self, instance):
         # Player voluntarily passes (does NOT activate all units)
+        self.close_activation()
+        self.build_grid()
+        self.pass_activation()
+
+    def close_activation(self):
+        """Drop any selection and open activation; its move can no longer be cancelled."""
         self.selected = None
+        self.unit_being_activated = None
+        self.activation_phase = None
+        self.activation_snapshot = None
         self.move_tiles.clear()
         self.attack_tiles.clear()
+
+    def snapshot(self):
+        """Capture the battle state for AI search or a "what-if" preview."""
+        return BattleSnapshot.from_combat_screen(self)
+
+    def restore_snapshot(self, snapshot):
+        """Return the board to a state captured with snapshot()."""
+        snapshot.restore_to_screen(self)
+        self.round_label.text = f"Round {self.round_number}"
+        self.update_pulse_display()
         self.build_grid()
-        self.pass_activation()
 
+    def build_threat_map(self):
+        """Reach and damage tables for the enemy side, built once per enemy activation."""
+        enemies = [(u, pos) for u, pos in self.enemy_positions.items() if u.is_alive()]
+        players = [(u, pos, u.current_hp) for u, pos in self.player_positions.items() if u.is_alive()]
+        return ThreatMap(self.grid_size, enemies, players)
+
+    @timed('enemy_turn')
     def enemy_turn(self, dt):
         # Enemy activates one unactivated unit
         unactivated = [u for u in self.enemy_units if u.is_alive() and u not in self.activated_enemy_units]
         if unactivated:
             enemy = unactivated[0]
             enemy_pos = self.enemy_positions[enemy]
-            # Find closest player unit
-            closest_player = None
-            closest_distance = float('inf')
-            for player_unit, player_pos in self.player_positions.items():
-                if player_unit.is_alive():
-                    distance = abs(enemy_pos[0] - player_pos[0]) + abs(enemy_pos[1] - player_pos[1])
-                    if distance < closest_distance:
-                        closest_distance = distance
-                        closest_player = (player_unit, player_pos)
-            if closest_player:
-                target_unit, target_pos = closest_player
-                # If adjacent, attack
-                if closest_distance == 1:
-                    # --- Dice-based combat for enemy ---
-                    atk_dice = roll_dice(enemy.atk, enemy)
-                    def_dice = roll_dice(target_unit.def_, target_unit)
-                    swords = atk_dice.count('Sword')
-                    shields = def_dice.count('Shield')
-                    pulse_att = atk_dice.count('Pulse')
-                    pulse_def = def_dice.count('Pulse')
-                    net_damage = max(0, swords - shields)
-                    # Update Pulse pools
-                    self.enemy_pulse += pulse_att
-                    self.player_pulse += pulse_def
-                    self.update_pulse_display()
-                    # Apply damage
-                    target_unit.current_hp -= net_damage
-                    # Log dice results
-                    self.log(f"{enemy.name} rolled: {atk_dice}")
-                    self.log(f"{target_unit.name} rolled: {def_dice}")
-                    self.log(f"Swords: {swords}, Shields: {shields}, Enemy Pulse: +{pulse_att}, Player Pulse: +{pulse_def}")
-                    if net_damage > 0:
-                        self.log(f"{enemy.name} dealt {net_damage} damage to {target_unit.name}.")
-                    else:
-                        self.log(f"{target_unit.name} blocked all damage!")
-                    if target_unit.current_hp <= 0:
-                        self.log(f"{target_unit.name} has fallen!")
+            # The threat map picks the target and where to head for
+            threat_map = self.build_threat_map()
+            a = threat_map.friend_index(enemy)
+            target, attack_tile = threat_map.best_target(a)
+            adjacent = [p for p, (_, pos, _) in enumerate(threat_map.foes)
+                        if abs(enemy_pos[0] - pos[0]) + abs(enemy_pos[1] - pos[1]) == 1]
+            if adjacent:
+                # If adjacent, attack (the most promising adjacent player unit)
+                p = max(adjacent, key=threat_map.opportunity[a].__getitem__)
+                self.enemy_attack(enemy, threat_map.foes[p][0])
+            elif target is not None:
+                # Move one tile toward the attack tile, or the target itself
+                # when already standing there
+                destination = threat_map.foes[target][1]
+                if attack_tile is not None and attack_tile != enemy_pos:
+                    destination = attack_tile
+                ex, ey = enemy_pos
+                px, py = destination
+                dx = px - ex
+                dy = py - ey
+                if abs(dx) > abs(dy):
+                    step = (ex + (1 if dx > 0 else -1), ey)
                 else:
-                    # Move toward closest player
-                    ex, ey = enemy_pos
-                    px, py = target_pos
-                    dx = px - ex
-                    dy = py - ey
-                    if abs(dx) > abs(dy):
-                        step = (ex + (1 if dx > 0 else -1), ey)
-                    else:
-                        step = (ex, ey + (1 if dy > 0 else -1))
-                    if (0 <= step[0] < self.grid_size and 0 <= step[1] < self.grid_size):
-                        unit_at_step, unit_type = self.get_unit_at_position(step)
-                        if not unit_at_step:
-                            # Empty tile, move there
-                            self.enemy_positions[enemy] = step
-                            self.log(f"{enemy.name} moved to {step}.")
-                        elif unit_type == "enemy":
-                            # Friendly unit, find empty tile nearby to end movement
-                            final_pos = self.find_empty_tile_near(step)
-                            if final_pos:
-                                self.enemy_positions[enemy] = final_pos
-                                self.log(f"{enemy.name} moved through friendly unit to {final_pos}.")
-                            # If no empty tile found, enemy stays in place
-                        # If enemy unit is blocking, enemy stays in place
+                    step = (ex, ey + (1 if dy > 0 else -1))
+                if (0 <= step[0] < self.grid_size and 0 <= step[1] < self.grid_size):
+                    unit_at_step, unit_type = self.get_unit_at_position(step)
+                    if not unit_at_step:
+                        # Empty tile, move there
+                        self.enemy_positions[enemy] = step
+                        self.log(f"{enemy.name} moved to {step}.")
+                    elif unit_type == "enemy":
+                        # Friendly unit, find empty tile nearby to end movement
+                        final_pos = self.find_empty_tile_near(step)
+                        if final_pos:
+                            self.enemy_positions[enemy] = final_pos
+                            self.log(f"{enemy.name} moved through friendly unit to {final_pos}.")
+                        # If no empty tile found, enemy stays in place
+                    # If enemy unit is blocking, enemy stays in place
             self.activated_enemy_units.add(enemy)
             self.build_grid()
             self.pass_activation()
@@ -755,6 +765,32 @@ class CombatScreen(Screen):
             # No unactivated enemy units, just pass
             self.pass_activation()
 
+    def enemy_attack(self, enemy, target_unit):
+        """Resolve a dice-based attack from an enemy on a player unit."""
+        atk_dice = roll_dice(enemy.atk, enemy)
+        def_dice = roll_dice(target_unit.def_, target_unit)
+        swords = atk_dice.count('Sword')
+        shields = def_dice.count('Shield')
+        pulse_att = atk_dice.count('Pulse')
+        pulse_def = def_dice.count('Pulse')
+        net_damage = max(0, swords - shields)
+        # Update Pulse pools
+        self.enemy_pulse += pulse_att
+        self.player_pulse += pulse_def
+        self.update_pulse_display()
+        # Apply damage
+        target_unit.current_hp -= net_damage
+        # Log dice results
+        self.log(f"{enemy.name} rolled: {atk_dice}")
+        self.log(f"{target_unit.name} rolled: {def_dice}")
+        self.log(f"Swords: {swords}, Shields: {shields}, Enemy Pulse: +{pulse_att}, Player Pulse: +{pulse_def}")
+        if net_damage > 0:
+            self.log(f"{enemy.name} dealt {net_damage} damage to {target_unit.name}.")
+        else:
+            self.log(f"{target_unit.name} blocked all damage!")
+        if target_unit.current_hp <= 0:
+            self.log(f"{target_unit.name} has fallen!")
+
     def start_new_round(self, dt):
         self.round_number += 1
         self.activated_player_units.clear()
@@ -795,6 +831,7 @@ class CombatScreen(Screen):
 
     def show_unit_info(self, unit):
         # Show a popup with unit stats and a Cancel button
+        from kivy.uix.popup import Popup  # Only needed once a unit is inspected
         stats = unit.get_stats()
         info_text = f"[b]{unit.name}[/b] ({unit.unit_type})\n"
         info_text += f"HP: {unit.current_hp}/{unit.hp}\nATK: {unit.atk}\nDEF: {unit.def_}\nMOV: {unit.mov}\nRNG: {unit.rng}\nLVL: {unit.level}\nXP: {unit.xp}\n"
@@ -816,6 +853,14 @@ class CombatScreen(Screen):
 
     def cancel_activation(self, instance):
         # Cancel the current activation phase, return to selection state
+        if self.active_side != "player":
+            return  # The player has nothing open during the enemy's turn
+        snapshot, self.activation_snapshot = self.activation_snapshot, None
+        if snapshot is not None and self.activation_phase is not None:
+            # Take back the move; Pulse spent meanwhile stays spent
+            snapshot.pulse = (self.player_pulse, self.enemy_pulse)
+            self.restore_snapshot(snapshot)
+            return
         self.selected = None
         self.unit_being_activated = None
         self.activation_phase = None
@@ -857,8 +902,7 @@ class CombatScreen(Screen):
         self.pulse_label.text = self.get_pulse_text()
 
     def load_upgrades(self):
-        _, upgrades = load_army()
-        return upgrades if upgrades is not None else {}
+        return save_repository.get_upgrades()
 
     def activate_another_unit(self, instance):
         pulse_cost = 10
@@ -8,6 +8,8 @@ from kivy.metrics import dp
 from kivy.core.window import Window
 from kivy.utils import platform
 
+from asset_pipeline import texture_cache
+
 class LandingScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -19,12 +21,11 @@ class LandingScreen(Screen):
         # Create the main vertical layout
         main_layout = BoxLayout(orientation='vertical', padding=padding, spacing=spacing)
 
-        # Top: background village image
-        village_image = Image(
-            source='assets/images/village_bg.png',
-            size_hint_y=0.5
-        )
-        main_layout.add_widget(village_image)
+        # Top: background village image, decoded in the background and
+        # faded in when ready so it doesn't hold up the first frame
+        self.village_image = Image(size_hint_y=0.5, opacity=0)
+        main_layout.add_widget(self.village_image)
+        texture_cache.request('landing', 'village_bg', self.show_village)
 
         # Middle: Button Grid - Mobile optimized
         if platform in ['android', 'ios']:
@@ -87,6 +88,10 @@ class LandingScreen(Screen):
         # Add everything to this screen
         self.add_widget(main_layout)
 
+    def show_village(self, texture):
+        self.village_image.texture = texture
+        self.village_image.opacity = 1
+
     # Each of these methods tells the ScreenManager to switch screens
     def go_to_battle(self, instance):
         self.manager.current = 'battle'
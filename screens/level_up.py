@@ -1,6 +1,3 @@
-import sys, os
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.gridlayout import GridLayout
@@ -8,12 +5,18 @@ from kivy.uix.button import Button
 from kivy.uix.label import Label
 from kivy.metrics import dp
 from unit_data import Unit
-from tile_effects import (
-    get_militia_tile_map,
-    get_archer_tile_map,
-    get_acolyte_tile_map,
-    get_scout_tile_map
-)
+from save_repository import save_repository
+from game_data import get_tile_map
+from evolution_grid import tile_bit
+from build_optimizer import suggest_tile
+
+HINT_LOOKAHEAD = 4  # Unlocks the build hint plans ahead
+
+
+# Grid tile looks: (text, background color, disabled)
+UNLOCKED_TILE = ("✔", [0.3, 0.8, 0.3, 1], True)
+LOCKED_TILE = ("", [0.5, 0.5, 0.5, 1], True)
+AVAILABLE_TILE_COLOR = [0.6, 0.6, 1, 1]
 
 
 class LevelUpScreen(Screen):
@@ -26,87 +29,94 @@ class LevelUpScreen(Screen):
         self.tile_map = {}  # Stores effects for this unit’s grid
         self.selected_pos = None  # Used for previewing a tile
 
-    def on_pre_enter(self):
-        """Called just before screen is shown. Rebuild layout."""
-        self.layout.clear_widgets()
+        # The widgets are built once here and updated in place for each unit
+        self.build_ui()
 
+    def on_pre_enter(self):
+        """Called just before screen is shown. Show the current unit."""
         if self.unit:
-            self.build_ui()
+            self.refresh()
 
     def set_unit(self, unit):
         """Receive a unit object and set up the tile map."""
         self.unit = unit
 
-        # Choose tile map based on unit type
-        unit_type = unit.unit_type.lower()
-
-        if unit_type == "militia":
-            self.tile_map = get_militia_tile_map()
-        elif unit_type == "archer":
-            self.tile_map = get_archer_tile_map()
-        elif unit_type == "acolyte":
-            self.tile_map = get_acolyte_tile_map()
-        elif unit_type == "scout":
-            self.tile_map = get_scout_tile_map()
-        else:
-            self.tile_map = {}  # fallback
-
+        # Tile map for this unit type, straight from the game data
+        self.tile_map = get_tile_map(unit.unit_type)
 
     def build_ui(self):
-        self.layout.clear_widgets()
-
         # Unit Name & Info
-        self.layout.add_widget(Label(text=f"[b]{self.unit.name}[/b] - Choose a new tile to unlock", markup=True, font_size='20sp'))
+        self.title_label = Label(text="", markup=True, font_size='20sp')
+        self.layout.add_widget(self.title_label)
 
-        # Evolution Grid
+        # Evolution Grid: one button per tile, restyled by refresh()
         grid = GridLayout(rows=5, cols=5, spacing=dp(4), size_hint_y=None, height=dp(250))
-
+        self.tile_buttons = {}
         for row in range(5):
             for col in range(5):
                 pos = (row, col)
-                is_unlocked = pos in self.unit.unlocked_tiles
-                is_adjacent = self._is_adjacent(pos)
-                tile_effect = self.tile_map.get(pos, None)
-
-                if is_unlocked:
-                    btn = Button(text="✔", background_color=[0.3, 0.8, 0.3, 1], disabled=True)
-
-                elif is_adjacent and tile_effect:
-                    btn = Button(
-                        text=tile_effect.label,
-                        background_color=[0.6, 0.6, 1, 1],
-                        font_size='12sp'
-                    )
-                    btn.bind(on_release=lambda instance, p=pos: self.preview_tile(p))
-
-                else:
-                    btn = Button(text="", background_color=[0.5, 0.5, 0.5, 1], disabled=True)
-
+                btn = Button(font_size='12sp')
+                btn.bind(on_release=lambda instance, p=pos: self.preview_tile(p))
+                self.tile_buttons[pos] = btn
                 grid.add_widget(btn)
 
-        self.layout.add_widget(grid)        
+        self.layout.add_widget(grid)
+
+        # Build hint: best next tile for each goal
+        self.hint_label = Label(text="", markup=True, font_size='13sp',
+                                size_hint_y=None, height=dp(30))
+        self.layout.add_widget(self.hint_label)
 
         # Add tile preview label
-        self.preview_label = Label(text="", font_size='14sp', size_hint_y=None, height=dp(60))
+        self.preview_label = Label(text="", markup=True, font_size='14sp', size_hint_y=None, height=dp(60))
         self.layout.add_widget(self.preview_label)
 
+        # Confirmation button for the previewed tile, hidden until a tile is picked
+        self.confirm_button = Button(text="", size_hint_y=None, height=dp(40), opacity=0, disabled=True)
+        self.confirm_button.bind(on_release=lambda instance: self.confirm_unlock(self.selected_pos))
+        self.layout.add_widget(self.confirm_button)
+
         # Cancel Button
-        cancel = Button(text="Cancel", size_hint_y=None, height=dp(40))
-        cancel.bind(on_release=self.go_back)
+        self.cancel_button = Button(text="Cancel", size_hint_y=None, height=dp(40))
+        self.cancel_button.bind(on_release=self.go_back)
+
+        #self.layout.add_widget(self.cancel_button)
+
+    def refresh(self):
+        """Show the current unit's grid, hint and an empty preview."""
+        self.title_label.text = f"[b]{self.unit.name}[/b] - Choose a new tile to unlock"
+
+        unlocked = self.unit.unlocked_mask
+        available = self.unit.available_mask
+        for pos, btn in self.tile_buttons.items():
+            bit = tile_bit(pos)
+            tile_effect = self.tile_map.get(pos, None)
+
+            if unlocked & bit:
+                btn.text, btn.background_color, btn.disabled = UNLOCKED_TILE
+            elif available & bit and tile_effect:
+                btn.text, btn.background_color, btn.disabled = tile_effect.label, AVAILABLE_TILE_COLOR, False
+            else:
+                btn.text, btn.background_color, btn.disabled = LOCKED_TILE
+
+        self.hint_label.text = self.build_hint()
+        self.show_preview(None)
+
+    def build_hint(self):
+        """One line naming the best next tile for damage and for survival."""
+        parts = []
+        for goal in ('damage', 'survival'):
+            pos = suggest_tile(self.unit, goal, HINT_LOOKAHEAD)
+            if pos is not None:
+                parts.append(f"{goal}: [b]{self.tile_map[pos].label}[/b]")
+        return "Suggested - " + ", ".join(parts) if parts else ""
 
     def go_back(self, instance):
         self.manager.current = 'units'
 
-        #self.layout.add_widget(cancel)
-
     def _is_adjacent(self, pos):
-        """Check if pos is orthogonally adjacent to any unlocked tile."""
-        for tile in self.unit.unlocked_tiles:
-            r, c = tile
-            pr, pc = pos
-            if (abs(r - pr) == 1 and c == pc) or (abs(c - pc) == 1 and r == pr):
-                return True
-        return False
+        """Check if pos is a locked tile orthogonally adjacent to an unlocked one."""
+        return self.unit.can_unlock(pos)
 
     def unlock_tile(self, pos):
         """Unlock the tile and return to unit screen."""
@@ -115,30 +125,34 @@ class LevelUpScreen(Screen):
 
     def preview_tile(self, pos):
         """Show the effect of a tile and let player confirm unlock."""
-        tile_effect = self.tile_map.get(pos)
-        if not tile_effect:
+        if pos in self.tile_map:
+            self.show_preview(pos)
+
+    def show_preview(self, pos):
+        """Show a tile's label, description and confirm button, or clear them for None."""
+        self.selected_pos = pos
+        tile_effect = self.tile_map.get(pos) if pos is not None else None
+        if tile_effect is None:
+            self.preview_label.text = ""
+            self.confirm_button.opacity = 0
+            self.confirm_button.disabled = True
             return
 
         # Show label + description
         self.preview_label.text = f"[b]{tile_effect.label}[/b]: {tile_effect.flavor_text}"
-        self.preview_label.markup = True
 
-        # Show a confirmation button
-        confirm_btn = Button(text=f"Unlock '{tile_effect.label}'", size_hint_y=None, height=dp(40))
-        confirm_btn.bind(on_release=lambda instance: self.confirm_unlock(pos))
-        self.layout.add_widget(confirm_btn)
+        # Show the confirmation button
+        self.confirm_button.text = f"Unlock '{tile_effect.label}'"
+        self.confirm_button.opacity = 1
+        self.confirm_button.disabled = False
 
     def confirm_unlock(self, pos):
-        """Apply the effect and unlock the tile."""
-        tile_effect = self.tile_map.get(pos)
-        if not tile_effect:
+        """Unlock the tile; its effect is part of the unit's stats from then on."""
+        if pos not in self.tile_map:
             return
 
         # Unlock tile
-        self.unit.unlock_tile(pos)
-
-        # Apply its reward to the unit
-        self.unit.apply_tile_effect(tile_effect)
+        save_repository.unlock_tile(self.unit, pos)
 
         # Return to unit screen
         self.manager.current = 'units'
@@ -1,3 +1,4 @@
+from kivy.app import App
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
@@ -5,6 +6,9 @@ from kivy.uix.label import Label
 from kivy.uix.switch import Switch
 from kivy.metrics import dp
 from kivy.utils import platform
+from functools import partial
+
+from save_repository import save_repository
 
 class SettingsScreen(Screen):
     def __init__(self, **kwargs):
@@ -31,8 +35,9 @@ class SettingsScreen(Screen):
         self.create_setting_option("Sound Effects", True)
         self.create_setting_option("Background Music", True)
         self.create_setting_option("Vibration", platform in ['android', 'ios'])
-        self.create_setting_option("Auto-save", True)
+        self.create_setting_option("Auto-save", save_repository.autosave_enabled, self.on_autosave_changed)
         self.create_setting_option("Show Tutorial", True)
+        self.create_setting_option("Debug Overlay", False, self.on_debug_overlay_changed)
 
         # Spacer
         spacer = Label(size_hint_y=1)
@@ -52,8 +57,9 @@ class SettingsScreen(Screen):
 
         self.add_widget(self.layout)
 
-    def create_setting_option(self, text, default_value):
-        """Create a setting option with label and switch."""
+    def create_setting_option(self, text, default_value, on_change=None):
+        """Create a setting option with label and switch, initialised from the saved settings."""
+        key = text.lower().replace(' ', '_').replace('-', '')  # "Auto-save" -> "autosave"
         # Container for this setting
         setting_container = BoxLayout(
             orientation='horizontal',
@@ -75,18 +81,28 @@ class SettingsScreen(Screen):
 
         # Switch
         switch = Switch(
-            active=default_value,
+            active=save_repository.get_setting(key, default_value),
             size_hint_x=0.3
         )
-        switch.bind(active=self.on_setting_changed)
+        switch.bind(active=on_change or partial(self.on_setting_changed, key))
         setting_container.add_widget(switch)
 
         self.layout.add_widget(setting_container)
 
-    def on_setting_changed(self, instance, value):
+    def on_setting_changed(self, key, instance, value):
         """Handle setting changes."""
-        # Here you would save the setting to persistent storage
-        print(f"Setting changed: {value}")
+        # Only the small settings section is written, never the army
+        save_repository.set_setting(key, value)
+        print(f"Setting changed: {key} = {value}")
+
+    def on_autosave_changed(self, instance, value):
+        """Drive the background saver from the Auto-save switch."""
+        save_repository.set_autosave(value)
+
+    def on_debug_overlay_changed(self, instance, value):
+        """Show or hide the frame-time overlay, and keep it across restarts."""
+        save_repository.set_setting('debug_overlay', value)
+        App.get_running_app().set_debug_overlay(value)
 
     def go_back(self, instance):
         """Return to the landing screen."""
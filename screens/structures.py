@@ -1,4 +1,3 @@
-import sys, os
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
@@ -6,8 +5,7 @@ from kivy.uix.button import Button
 from kivy.metrics import dp
 from kivy.utils import platform
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from unit_data import save_army, load_army, create_mock_roster
+from save_repository import save_repository
 
 class StructuresScreen(Screen):
     def __init__(self, **kwargs):
@@ -41,20 +39,13 @@ class StructuresScreen(Screen):
         self.layout.add_widget(back_btn)
 
     def unlock_wizards_tower(self, instance):
-        self.upgrades['wizards_tower'] = True
-        self.save_upgrades()
+        # Only the small upgrades section is written; the roster is untouched
+        save_repository.set_upgrade('wizards_tower', True, persist=True)
+        self.upgrades = save_repository.get_upgrades()
         self.build_ui()
 
     def load_upgrades(self):
-        _, upgrades = load_army()
-        return upgrades if upgrades is not None else {}
-
-    def save_upgrades(self):
-        # Save upgrades with a dummy army (or load the current one if you want to persist units too)
-        units, _ = load_army()
-        if units is None:
-            units = create_mock_roster()
-        save_army(units, upgrades=self.upgrades)
+        return save_repository.get_upgrades()
 
     def go_back(self, instance):
         self.manager.current = 'landing'
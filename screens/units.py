@@ -1,18 +1,115 @@
-import sys, os
+import time
 from kivy.uix.screenmanager import Screen
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.scrollview import ScrollView
-from kivy.uix.gridlayout import GridLayout
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
 from kivy.uix.label import Label
 from kivy.uix.button import Button
+from kivy.uix.spinner import Spinner
 from kivy.metrics import dp
 from kivy.utils import platform
-from functools import partial  # Helps pass arguments to button functions
 
-# Allow parent folder import
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from unit_data import create_mock_roster, save_army, load_army
+from unit_data import create_mock_roster
 from game_state import game_state
+from save_repository import save_repository
+from save_slots import slot_index
+from perf_timings import timed
+
+
+class UnitCard(RecycleDataViewBehavior, BoxLayout):
+    """
+    A unit card in the roster list. The list only creates enough cards to
+    fill the visible area and rebinds them to other units while scrolling,
+    so cards are built once and refresh_view_attrs fills in a unit's data.
+    """
+    def __init__(self, **kwargs):
+        super().__init__(
+            orientation='vertical',
+            padding=dp(12) if platform in ['android', 'ios'] else dp(10),
+            spacing=dp(8) if platform in ['android', 'ios'] else dp(5),
+            **kwargs
+        )
+        self.screen = None
+        self.unit = None
+
+        # Mobile-optimized fonts
+        title_font = '22sp' if platform in ['android', 'ios'] else '20sp'
+        body_font = '18sp' if platform in ['android', 'ios'] else '16sp'
+        button_font = '16sp' if platform in ['android', 'ios'] else '14sp'
+        button_height = dp(45) if platform in ['android', 'ios'] else dp(40)
+
+        # Top: Name and type
+        self.title_label = Label(markup=True, font_size=title_font, color=(1, 1, 1, 1))
+        self.add_widget(self.title_label)
+
+        # Level and XP
+        self.level_label = Label(font_size=body_font, color=(0.9, 0.9, 0.9, 1))
+        self.add_widget(self.level_label)
+
+        # Core stats
+        self.stats_label = Label(font_size=body_font, color=(0.8, 0.8, 0.8, 1))
+        self.add_widget(self.stats_label)
+        self.move_label = Label(font_size=body_font, color=(0.8, 0.8, 0.8, 1))
+        self.add_widget(self.move_label)
+
+        # Selection Button
+        self.select_button = Button(size_hint_y=None, height=button_height, font_size=button_font)
+        self.select_button.bind(on_release=self.on_select)
+        self.add_widget(self.select_button)
+
+        # Add XP Button
+        self.xp_button = Button(text="➕ Add 50 XP", size_hint_y=None, height=button_height,
+                                font_size=button_font)
+        self.xp_button.bind(on_release=self.on_add_xp)
+        self.add_widget(self.xp_button)
+
+        # Level Up Button (hidden unless there's a tile to unlock)
+        self.level_up_button = Button(text="⭐ Level Up!", size_hint_y=None, height=button_height,
+                                      font_size=button_font)
+        self.level_up_button.bind(on_release=self.on_level_up)
+        self.add_widget(self.level_up_button)
+
+    def refresh_view_attrs(self, rv, index, data):
+        """Bind this card to the unit at data['unit_index'] and show it."""
+        self.screen = data['screen']
+        cards = self.screen.cards
+        if cards.get(self.unit) is self:
+            del cards[self.unit]  # This card no longer shows its old unit
+        self.unit = self.screen.unit_roster[data['unit_index']]
+        cards[self.unit] = self
+        self.update()
+        return super().refresh_view_attrs(rv, index, data)
+
+    def update(self):
+        unit = self.unit
+        stats = unit.get_stats()
+        self.title_label.text = f"[b]{unit.name}[/b] ({unit.unit_type})"
+        self.level_label.text = f"Level {stats['LVL']} | XP: {stats['XP']} / {unit.xp_to_next_level()}"
+        self.stats_label.text = f"HP: {stats['HP']}  |  ATK: {stats['ATK']}  |  DEF: {stats['DEF']}"
+        self.move_label.text = f"MOV: {stats['MOV']}  |  RNG: {stats['RNG']}"
+        self.update_selection()
+        has_level = self.screen.unit_has_unspent_level(unit)
+        self.level_up_button.disabled = not has_level
+        self.level_up_button.opacity = 1 if has_level else 0
+
+    def update_selection(self):
+        if game_state.is_unit_selected(self.unit):
+            self.select_button.text = "❌ Remove from Party"
+        elif game_state.can_add_unit():
+            self.select_button.text = "✅ Add to Party"
+        else:
+            self.select_button.text = "🚫 Party Full"
+
+    def on_select(self, instance):
+        self.screen.toggle_unit_selection(self.unit, self.select_button, instance)
+
+    def on_add_xp(self, instance):
+        self.screen.add_xp_to_unit(self.unit, instance)
+
+    def on_level_up(self, instance):
+        self.screen.go_to_level_up(self.unit, instance)
+
 
 class UnitsScreen(Screen):
     def __init__(self, **kwargs):
@@ -51,29 +148,53 @@ class UnitsScreen(Screen):
         title_container.add_widget(title_label)
         title_container.add_widget(party_info_label)
         self.layout.add_widget(title_container)
+
+        # Save slot picker, filled from the slot header index
+        self.slot_spinner = Spinner(
+            text=f"💾 Slot: {save_repository.slot}",
+            size_hint_y=None,
+            height=dp(45) if platform in ['android', 'ios'] else dp(35),
+            font_size='16sp' if platform in ['android', 'ios'] else '14sp'
+        )
+        self.slot_names = {}
+        self.slot_spinner.bind(on_press=self.refresh_slot_list)
+        self.slot_spinner.bind(text=self.on_slot_selected)
+        self.layout.add_widget(self.slot_spinner)
         
         # Store reference to party info label for updates
         self.party_info_label = party_info_label
 
-        # Scrollable area for unit cards
-        self.scroll = ScrollView(size_hint=(1, 0.8))
-
-        # Grid inside the scroll for unit entries
-        self.unit_grid = GridLayout(cols=1, spacing=spacing, size_hint_y=None)
-        self.unit_grid.bind(minimum_height=self.unit_grid.setter('height'))
+        # Scrollable, recycled list of unit cards: only the visible cards
+        # exist as widgets, each bound to a unit by its roster index
+        card_height = dp(280) if platform in ['android', 'ios'] else dp(240)
+        self.unit_list = RecycleView(size_hint=(1, 0.8))
+        unit_layout = RecycleBoxLayout(
+            orientation='vertical',
+            spacing=spacing,
+            default_size=(None, card_height),
+            default_size_hint=(1, None),
+            size_hint_y=None
+        )
+        unit_layout.bind(minimum_height=unit_layout.setter('height'))
+        self.unit_list.add_widget(unit_layout)
+        self.unit_list.viewclass = UnitCard  # Set once the layout exists
 
         # Load saved army or mock unit data
-        loaded_army, _ = load_army()
+        loaded_army = save_repository.get_units()
         if loaded_army:
             self.unit_roster = loaded_army
         else:
             self.unit_roster = create_mock_roster()
+            save_repository.set_units(self.unit_roster)
 
-        # Build UI
+        # Build UI; listen for party changes before restoring the saved
+        # party so the party count shows it
+        self.cards = {}  # Unit -> the card currently showing it
+        game_state.bind_party(self.on_party_changed)
+        game_state.selected_units = save_repository.get_party_units()
         self.refresh_unit_display()
 
-        self.scroll.add_widget(self.unit_grid)
-        self.layout.add_widget(self.scroll)
+        self.layout.add_widget(self.unit_list)
 
         # Button container
         button_height = dp(60) if platform in ['android', 'ios'] else dp(50)
@@ -124,120 +245,30 @@ class UnitsScreen(Screen):
         self.layout.add_widget(button_container)
         self.add_widget(self.layout)
 
-    def refresh_unit_display(self):
-        """Rebuilds the unit display grid (used after XP changes)."""
-        self.unit_grid.clear_widgets()
-
-        # Rebuild each unit card
-        for unit in self.unit_roster:
-            unit_card = self.build_unit_card(unit)
-            self.unit_grid.add_widget(unit_card)
-
-    def build_unit_card(self, unit):
-        """Creates a unit info card with selection and +XP buttons."""
-        # Mobile-optimized card dimensions
-        card_height = dp(280) if platform in ['android', 'ios'] else dp(240)
-        card_padding = dp(12) if platform in ['android', 'ios'] else dp(10)
-        card_spacing = dp(8) if platform in ['android', 'ios'] else dp(5)
-        
-        # Main vertical layout for unit info
-        box = BoxLayout(
-            orientation='vertical', 
-            size_hint_y=None, 
-            height=card_height, 
-            padding=card_padding, 
-            spacing=card_spacing
-        )
-        stats = unit.get_stats()
+    def on_pre_enter(self):
+        # Back from the level-up screen: show the new stats and tiles
+        self.unit_list.refresh_from_data()
 
-        # Mobile-optimized fonts
-        title_font = '22sp' if platform in ['android', 'ios'] else '20sp'
-        body_font = '18sp' if platform in ['android', 'ios'] else '16sp'
-        button_font = '16sp' if platform in ['android', 'ios'] else '14sp'
-
-        # Top: Name and type
-        box.add_widget(Label(
-            text=f"[b]{unit.name}[/b] ({unit.unit_type})", 
-            markup=True, 
-            font_size=title_font,
-            color=(1, 1, 1, 1)
-        ))
-
-        # Level and XP
-        level_label = Label(
-            text=f"Level {stats['LVL']} | XP: {stats['XP']} / {unit.xp_to_next_level()}",
-            font_size=body_font,
-            color=(0.9, 0.9, 0.9, 1)
-        )
-        box.add_widget(level_label)
-
-        # Core stats
-        box.add_widget(Label(
-            text=f"HP: {stats['HP']}  |  ATK: {stats['ATK']}  |  DEF: {stats['DEF']}", 
-            font_size=body_font,
-            color=(0.8, 0.8, 0.8, 1)
-        ))
-        box.add_widget(Label(
-            text=f"MOV: {stats['MOV']}  |  RNG: {stats['RNG']}", 
-            font_size=body_font,
-            color=(0.8, 0.8, 0.8, 1)
-        ))
-
-        # Mobile-optimized buttons
-        button_height = dp(45) if platform in ['android', 'ios'] else dp(40)
-        
-        # Selection Button
-        is_selected = game_state.is_unit_selected(unit)
-        if is_selected:
-            select_text = "❌ Remove from Party"
-            select_color = (0.8, 0.2, 0.2, 1)
-        else:
-            if game_state.can_add_unit():
-                select_text = "✅ Add to Party"
-                select_color = (0.2, 0.8, 0.2, 1)
-            else:
-                select_text = "🚫 Party Full"
-                select_color = (0.5, 0.5, 0.5, 1)
-        
-        select_button = Button(
-            text=select_text,
-            size_hint_y=None,
-            height=button_height,
-            font_size=button_font
-        )
-        select_button.bind(on_release=partial(self.toggle_unit_selection, unit, select_button))
-        box.add_widget(select_button)
-
-        # Add XP Button
-        xp_button = Button(
-            text="➕ Add 50 XP", 
-            size_hint_y=None, 
-            height=button_height,
-            font_size=button_font
-        )
-        # Use partial to pass both the unit and label to the method
-        xp_button.bind(on_release=partial(self.add_xp_to_unit, unit, level_label))
-        box.add_widget(xp_button)
-
-        # Level Up Button (only if there's a tile to unlock)
-        if self.unit_has_unspent_level(unit):
-            level_up_button = Button(
-                text="⭐ Level Up!", 
-                size_hint_y=None, 
-                height=button_height, 
-                font_size=button_font
-            )
-            level_up_button.bind(on_release=partial(self.go_to_level_up, unit))
-            box.add_widget(level_up_button)
-
-        return box
-
-    def add_xp_to_unit(self, unit, level_label, instance):
+    @timed('refresh_unit_display')
+    def refresh_unit_display(self):
+        """Point the unit list at the current roster (used after loading)."""
+        # Data items are just indices, so a lazily loaded roster only decodes
+        # the units that scroll into view
+        self.cards.clear()
+        self.unit_list.data = [{'screen': self, 'unit_index': k} for k in range(len(self.unit_roster))]
+
+    def update_card(self, unit):
+        """Refresh the card showing unit, if it has one; other cards are untouched."""
+        card = self.cards.get(unit)
+        if card is not None and card.unit is unit:
+            card.update()
+
+    def add_xp_to_unit(self, unit, instance):
         """Adds XP to a unit and updates the UI."""
-        unit.add_xp(50)  # You can change this value as needed
+        save_repository.add_xp(unit, 50)  # You can change this value as needed
 
-        # Update the level/XP label in-place
-        level_label.text = f"Level {unit.level} | XP: {unit.xp} / {unit.xp_to_next_level()}"
+        # Update the unit's card in-place
+        self.update_card(unit)
 
         # Optional: print to console
         print(f"{unit.name} is now level {unit.level} with {unit.xp} XP")
@@ -248,7 +279,7 @@ class UnitsScreen(Screen):
 
     def unit_has_unspent_level(self, unit):
         # For now, we assume 1 tile unlocked per level
-        return unit.level > len(unit.unlocked_tiles)
+        return unit.level > unit.unlocked_count()
 
     def go_to_level_up(self, unit, instance):
         """Send selected unit to LevelUpScreen."""
@@ -260,32 +291,77 @@ class UnitsScreen(Screen):
         if game_state.is_unit_selected(unit):
             # Remove from party
             game_state.remove_unit_from_party(unit)
-            button.text = "✅ Add to Party"
         else:
             # Add to party if there's room
-            if game_state.add_unit_to_party(unit):
-                button.text = "❌ Remove from Party"
-        
-        # Update party info
-        self.party_info_label.text = f"Party: {game_state.get_party_size()}/{game_state.max_party_size}"
-        
-        # Refresh all unit cards to update selection states
-        self.refresh_unit_display()
-    
+            game_state.add_unit_to_party(unit)
+
+        save_repository.set_party(game_state.selected_units)
+
     def clear_party(self, instance):
         """Clear all units from the battle party."""
         game_state.clear_party()
+        save_repository.set_party([])
+
+    def on_party_changed(self, changed, capacity_changed):
+        """Party listener: update the party count and only the affected cards."""
         self.party_info_label.text = f"Party: {game_state.get_party_size()}/{game_state.max_party_size}"
-        self.refresh_unit_display()
+        if capacity_changed:
+            # "Add to Party" / "Party Full" flips on every visible card
+            for card in list(self.cards.values()):
+                card.update_selection()
+            return
+        for unit in changed:
+            card = self.cards.get(unit)
+            if card is not None and card.unit is unit:
+                card.update_selection()
+
+    def refresh_slot_list(self, instance=None):
+        """Fill the slot picker from the header index (no save is parsed)."""
+        save_repository.flush()  # Bring the current slot's header up to date
+        self.slot_names = {}
+        for header in slot_index.list_slots():
+            saved = time.strftime('%Y-%m-%d %H:%M', time.localtime(header.saved_at))
+            label = (f"{header.name} | {header.roster_size} units, max Lv {header.highest_level}"
+                     f" | {saved}")
+            if header.upgrades:
+                label += f" | {', '.join(header.upgrades)}"
+            self.slot_names[label] = header.name
+        self.slot_names["➕ New Slot"] = None
+        self.slot_spinner.values = list(self.slot_names)
+
+    def on_slot_selected(self, spinner, text):
+        if text not in self.slot_names:
+            return
+        name = self.slot_names[text]
+        if name is None:
+            # New slot: start it from the roster currently on screen
+            taken = {self.slot_names[k] for k in self.slot_names}
+            n = 1
+            while f"Slot {n}" in taken:
+                n += 1
+            name = f"Slot {n}"
+            roster, party = self.unit_roster, list(save_repository.party)
+            save_repository.use_slot(name)
+            save_repository.set_units(roster)
+            save_repository.party = party
+            save_repository.save()
+        else:
+            save_repository.use_slot(name)
+        spinner.text = f"💾 Slot: {name}"
+        self.load_saved_army(None)
 
     def save_current_army(self, instance):
-        save_army(self.unit_roster)
+        save_repository.set_units(self.unit_roster)
+        save_repository.save()
         print("Army saved!")
 
     def load_saved_army(self, instance):
-        loaded_army, _ = load_army()
+        # Explicit load discards unsaved changes and re-reads the file
+        save_repository.reload()
+        loaded_army = save_repository.get_units()
         if loaded_army:
             self.unit_roster = loaded_army
+            game_state.selected_units = save_repository.get_party_units()
             self.refresh_unit_display()
             print("Army loaded!")
         else:
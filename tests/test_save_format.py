@@ -0,0 +1,44 @@
+# tests/test_save_format.py
+# Round trips through the binary save format.
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_data import get_tile_map
+from save_format import LazyRoster
+from unit_data import Unit, load_save, save_army
+
+
+def test_very_high_level_round_trip(tmp_path):
+    unit = Unit("Veteran", "Warrior")
+    unit.add_xp(10 ** 7)
+    assert unit.level > 65535  # Past what a 16-bit level field holds
+
+    path = str(tmp_path / 'army.sav')
+    save_army([unit, Unit("Recruit", "Militia")], path)
+    units, _, _ = load_save(path)
+
+    assert isinstance(units, LazyRoster)
+    assert [level for _, _, level in units.entries()] == [unit.level, 1]
+    loaded = units[0]
+    assert (loaded.level, loaded.xp) == (unit.level, unit.xp)
+    assert loaded.to_dict() == unit.to_dict()
+
+
+def test_json_save_migrates_to_base_stats(tmp_path):
+    # JSON saves stored stats and abilities with tile effects added in
+    unit = Unit("Veteran", "Warrior")
+    for pos in sorted(get_tile_map("Warrior"), key=lambda p: abs(p[0] - 2) + abs(p[1] - 2)):
+        unit.unlock_tile(pos)
+    legacy = dict(unit.to_dict(), hp=unit.hp, atk=unit.atk, def_=unit.def_, mov=unit.mov, rng=unit.rng,
+                  abilities=list(unit.abilities), traits=list(unit.traits))
+    path = tmp_path / 'army.json'
+    path.write_text(json.dumps({'units': [legacy], 'upgrades': {'forge': True}}))
+
+    units, upgrades, _ = load_save(str(tmp_path / 'army.sav'))
+    assert upgrades == {'forge': True}
+    assert units[0].to_dict() == unit.to_dict()
+    assert units[0].stats == unit.stats
@@ -0,0 +1,163 @@
+# threat_map.py
+# Per-activation threat/opportunity tables for AI targeting.
+#
+# Tiles are flattened to index row * grid_size + col so every table is a flat
+# per-tile array. The tables are built once when a side starts an
+# activation; choosing a target is then an argmax over precomputed values
+# instead of re-walking the board for every candidate.
+
+from combat_rules import expected_damage, kill_chance
+
+KILL_WEIGHT = 3.0   # How much a likely kill is worth, in HP of damage
+RISK_WEIGHT = 0.5   # How much expected retaliation on the end tile costs
+
+_range_tables = {}
+
+
+def range_table(grid_size, rng):
+    """For each tile index, the tile indices within Manhattan distance 1..rng."""
+    key = (grid_size, rng)
+    table = _range_tables.get(key)
+    if table is None:
+        table = []
+        for r0 in range(grid_size):
+            for c0 in range(grid_size):
+                table.append(tuple(
+                    r * grid_size + c
+                    for r in range(grid_size) for c in range(grid_size)
+                    if 0 < abs(r - r0) + abs(c - c0) <= rng
+                ))
+        table = tuple(table)
+        _range_tables[key] = table
+    return table
+
+
+def reach_array(grid_size, start, mov, blocked, occupied):
+    """
+    Flat bool array of tiles a unit can end its move on.
+
+    :param blocked: tile indices the unit cannot enter (opposing units)
+    :param occupied: tile indices it can pass through but not stop on
+    """
+    size = grid_size * grid_size
+    reach = [False] * size
+    seen = [False] * size
+    seen[start] = True
+    frontier = [start]
+    for _ in range(mov):
+        nxt = []
+        for t in frontier:
+            for n in range_table(grid_size, 1)[t]:
+                if not seen[n] and n not in blocked:
+                    seen[n] = True
+                    nxt.append(n)
+        frontier = nxt
+    for t in range(size):
+        if seen[t] and (t == start or t not in occupied):
+            reach[t] = True
+    return reach
+
+
+class ThreatMap:
+    def __init__(self, grid_size, friends, foes):
+        """
+        Build reach, damage and retaliation tables for one side's activation.
+
+        :param friends: list of (unit, (row, col)) for the acting side
+        :param foes: list of (unit, (row, col), current_hp) for the other side
+        """
+        self.grid_size = grid_size
+        self.friends = friends
+        self.foes = foes
+        size = grid_size * grid_size
+        friend_tiles = {self.index(pos) for _, pos in friends}
+        foe_tiles = {self.index(pos) for _, pos, _ in foes}
+        self.foe_tile = [self.index(pos) for _, pos, _ in foes]
+
+        # reach[a][t]: friend a can end its move on tile t
+        self.reach = [reach_array(grid_size, self.index(pos), unit.mov, foe_tiles, friend_tiles | foe_tiles)
+                      for unit, pos in friends]
+
+        # reachers[t]: bitmask of friends that can stand on tile t this activation
+        self.reachers = [0] * size
+        for a, reach in enumerate(self.reach):
+            bit = 1 << a
+            for t in range(size):
+                if reach[t]:
+                    self.reachers[t] |= bit
+
+        # dealt[a][p] / kill[a][p]: expected damage and kill chance of friend a on foe p
+        self.dealt = [[expected_damage(unit, foe) for foe, _, _ in foes] for unit, _ in friends]
+        self.kill = [[kill_chance(unit, foe, hp) for foe, _, hp in foes] for unit, _ in friends]
+
+        # strikers[t]: foes that could move and hit tile t on their next activation
+        strikers = [[] for _ in range(size)]
+        for p, (foe, pos, _) in enumerate(foes):
+            marked = [False] * size
+            reach = reach_array(grid_size, self.index(pos), foe.mov, friend_tiles, friend_tiles | foe_tiles)
+            in_range = range_table(grid_size, foe.rng)
+            for t in range(size):
+                if reach[t]:
+                    for h in in_range[t]:
+                        marked[h] = True
+            for t in range(size):
+                if marked[t]:
+                    strikers[t].append(p)
+        self.strikers = strikers
+
+        # taken[a][t]: expected damage friend a would take standing on tile t
+        self.taken = [[sum(expected_damage(foes[p][0], unit) for p in strikers[t]) for t in range(size)]
+                      for unit, _ in friends]
+
+        # opportunity[a][p] and plan_tile[a][p]: best value of attacking foe p
+        # this activation, and the tile to attack from (None if out of reach)
+        self.opportunity = []
+        self.plan_tile = []
+        for a, (unit, _) in enumerate(friends):
+            in_range = range_table(grid_size, unit.rng)
+            reach, taken = self.reach[a], self.taken[a]
+            values, tiles = [], []
+            for p in range(len(foes)):
+                best, best_tile = float('-inf'), None
+                for t in in_range[self.foe_tile[p]]:
+                    if reach[t] and -taken[t] > best:
+                        best, best_tile = -taken[t], t
+                if best_tile is None:
+                    values.append(float('-inf'))
+                else:
+                    values.append(self.dealt[a][p] + KILL_WEIGHT * self.kill[a][p] + RISK_WEIGHT * best)
+                tiles.append(best_tile)
+            self.opportunity.append(values)
+            self.plan_tile.append(tiles)
+
+    def index(self, pos):
+        return pos[0] * self.grid_size + pos[1]
+
+    def tile(self, index):
+        return divmod(index, self.grid_size)
+
+    def friend_index(self, unit):
+        for a, (friend, _) in enumerate(self.friends):
+            if friend is unit:
+                return a
+        return None
+
+    def best_target(self, a):
+        """
+        Return (foe_index, attack_tile) for friend a.
+
+        attack_tile is the (row, col) to strike from when some foe can be hit
+        this activation; otherwise it is None and the foe is the closest one
+        to advance on.
+        """
+        if not self.foes:
+            return None, None
+        values = self.opportunity[a]
+        p = max(range(len(values)), key=values.__getitem__)
+        if values[p] != float('-inf'):
+            return p, self.tile(self.plan_tile[a][p])
+        # Nothing reachable: advance on the closest foe, weakest first on ties
+        r0, c0 = self.friends[a][1]
+        p = min(range(len(self.foes)),
+                key=lambda k: (abs(self.foes[k][1][0] - r0) + abs(self.foes[k][1][1] - c0), self.foes[k][2]))
+        return p, None
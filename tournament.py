@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Shattered Worlds Skirmish - AI Tournament Runner
+Plays enemy policies against each other over seeded headless battles and
+prints Elo ratings, score tables and time-per-decision statistics.
+
+Example:
+    python tournament.py --policies greedy focus search --games 500
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+from ai_policies import POLICIES, make_policy
+from battle_sim import Battle, play, MAX_ROUNDS
+from unit_data import Unit
+
+UNIT_TYPES = ['Warrior', 'Runeguard', 'Arcane Archer', 'Cleric']
+ELO_START = 1500.0
+ELO_K = 16.0
+
+
+def play_game(spec):
+    """
+    Worker entry point. Plays one battle and returns a plain dict so the
+    result pickles cheaply back to the parent process.
+
+    spec = (game_id, south_policy, north_policy, seed, army_size, max_rounds)
+    """
+    game_id, south, north, seed, army_size, max_rounds = spec
+    composition = random.Random(seed)
+    types = [composition.choice(UNIT_TYPES) for _ in range(army_size)]
+    armies = (
+        [Unit(f"South {t} {n + 1}", t) for n, t in enumerate(types)],
+        [Unit(f"North {t} {n + 1}", t) for n, t in enumerate(types)],
+    )
+    battle = Battle(armies, max_rounds=max_rounds, rng=random.Random(seed))
+    policies = (make_policy(south, seed), make_policy(north, seed + 1))
+    timings = ([], [])
+    winner = play(battle, policies, clock=time.perf_counter, timings=timings)
+    return {
+        'game': game_id,
+        'south': south,
+        'north': north,
+        'seed': seed,
+        'winner': winner,
+        'rounds': min(battle.round_number, max_rounds),
+        'timings': {south: timings[0], north: timings[1]} if south != north else {south: timings[0] + timings[1]},
+    }
+
+
+def schedule(policies, games, seed, army_size, max_rounds):
+    """
+    Every pairing plays `games` seeds twice, once from each side of the
+    board, so deployment and first activation are mirrored.
+    """
+    specs = []
+    game_id = 0
+    for pairing, (a, b) in enumerate(itertools.combinations(policies, 2)):
+        for n in range(games):
+            game_seed = seed * 1000003 + pairing * games + n
+            for south, north in ((a, b), (b, a)):
+                specs.append((game_id, south, north, game_seed, army_size, max_rounds))
+                game_id += 1
+    return specs
+
+
+def expected_score(rating, other):
+    return 1.0 / (1.0 + 10 ** ((other - rating) / 400.0))
+
+
+def rate(results, policies):
+    """Fold results (in game order) into Elo ratings and W/D/L tallies."""
+    ratings = {p: ELO_START for p in policies}
+    table = {p: {'wins': 0, 'draws': 0, 'losses': 0, 'games': 0} for p in policies}
+    for result in results:
+        south, north = result['south'], result['north']
+        if result['winner'] == 0:
+            score = 1.0
+        elif result['winner'] == 1:
+            score = 0.0
+        else:
+            score = 0.5
+        exp = expected_score(ratings[south], ratings[north])
+        ratings[south] += ELO_K * (score - exp)
+        ratings[north] -= ELO_K * (score - exp)
+        for policy, points in ((south, score), (north, 1.0 - score)):
+            row = table[policy]
+            row['games'] += 1
+            if points == 1.0:
+                row['wins'] += 1
+            elif points == 0.0:
+                row['losses'] += 1
+            else:
+                row['draws'] += 1
+    for policy, row in table.items():
+        row['elo'] = round(ratings[policy], 1)
+        row['score'] = (row['wins'] + 0.5 * row['draws']) / row['games'] if row['games'] else 0.0
+    return table
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def decision_stats(results, policies):
+    """Per-policy time-per-decision summary in microseconds."""
+    samples = {p: [] for p in policies}
+    for result in results:
+        for policy, durations in result['timings'].items():
+            samples[policy].extend(durations)
+    stats = {}
+    for policy, values in samples.items():
+        values.sort()
+        count = len(values)
+        stats[policy] = {
+            'decisions': count,
+            'mean_us': (sum(values) / count * 1e6) if count else 0.0,
+            'p50_us': percentile(values, 0.50) * 1e6,
+            'p95_us': percentile(values, 0.95) * 1e6,
+            'max_us': (values[-1] * 1e6) if count else 0.0,
+        }
+    return stats
+
+
+def print_report(table, stats, elapsed, total_games):
+    print(f"\n{total_games} games in {elapsed:.1f}s\n")
+    print(f"{'Policy':<10} {'Elo':>7} {'Score':>7} {'W':>6} {'D':>6} {'L':>6}")
+    for policy, row in sorted(table.items(), key=lambda kv: kv[1]['elo'], reverse=True):
+        print(f"{policy:<10} {row['elo']:>7.1f} {row['score'] * 100:>6.1f}% "
+              f"{row['wins']:>6} {row['draws']:>6} {row['losses']:>6}")
+    print(f"\n{'Policy':<10} {'Decisions':>10} {'Mean us':>9} {'p50 us':>9} {'p95 us':>9} {'Max us':>9}")
+    for policy, row in sorted(stats.items()):
+        print(f"{policy:<10} {row['decisions']:>10} {row['mean_us']:>9.1f} {row['p50_us']:>9.1f} "
+              f"{row['p95_us']:>9.1f} {row['max_us']:>9.1f}")
+
+
+def run_tournament(policies, games=100, seed=1, army_size=4, max_rounds=MAX_ROUNDS, workers=None):
+    """Play the full schedule on a process pool and return (results, table, stats)."""
+    specs = schedule(policies, games, seed, army_size, max_rounds)
+    if workers == 1:
+        results = [play_game(spec) for spec in specs]
+    else:
+        with Pool(processes=workers) as pool:
+            chunksize = max(1, len(specs) // ((workers or os.cpu_count() or 1) * 8))
+            results = list(pool.imap_unordered(play_game, specs, chunksize=chunksize))
+    # Elo depends on order, so fold results in schedule order regardless of pool timing
+    results.sort(key=lambda r: r['game'])
+    return results, rate(results, policies), decision_stats(results, policies)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play AI policies against each other and rate them.")
+    parser.add_argument('--policies', nargs='+', default=['greedy', 'threat', 'focus', 'search'],
+                        help=f"Policies to enter ({', '.join(sorted(POLICIES))})")
+    parser.add_argument('--games', type=int, default=100, help="Seeds per pairing (each is played mirrored)")
+    parser.add_argument('--seed', type=int, default=1, help="Base seed for the whole tournament")
+    parser.add_argument('--army-size', type=int, default=4, help="Units per side (max 4)")
+    parser.add_argument('--max-rounds', type=int, default=MAX_ROUNDS, help="Rounds before a battle is a draw")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--json', dest='json_path', default=None, help="Also write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    unknown = [p for p in args.policies if p not in POLICIES]
+    if unknown or len(set(args.policies)) < 2:
+        parser.error(f"need at least two distinct policies from: {', '.join(sorted(POLICIES))}")
+    policies = list(dict.fromkeys(args.policies))
+    army_size = max(1, min(args.army_size, 4))
+
+    start = time.perf_counter()
+    results, table, stats = run_tournament(policies, args.games, args.seed, army_size,
+                                           args.max_rounds, args.workers)
+    elapsed = time.perf_counter() - start
+    print_report(table, stats, elapsed, len(results))
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'table': table, 'decision_stats': stats,
+                       'games': [{k: v for k, v in r.items() if k != 'timings'} for r in results]},
+                      f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
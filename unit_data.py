@@ -5,8 +5,75 @@
 
 import json
 import os
+from collections import namedtuple
+from functools import lru_cache
+
+from evolution_grid import CENTER_FRONTIER, CENTER_MASK, count, frontier, grow_frontier, tile_bit, tiles_to_mask, mask_to_tiles
+from game_data import UNIT_TYPES, DEFAULT_UNIT_TYPE, XP_CURVE, get_tile_map, get_unit_type
+from save_format import LazyRoster, encode_save, is_binary_save
+
+DEFAULT_DIE_FACES = DEFAULT_UNIT_TYPE.die_faces
+
+# Every die-face tuple in use, so loaded units share them too
+_DIE_FACES = {faces: faces for faces in [DEFAULT_DIE_FACES] + [t.die_faces for t in UNIT_TYPES.values()]}
+
+
+def shared_die_faces(faces):
+    """The registry's tuple for these faces, or a new tuple if no type uses them."""
+    faces = tuple(faces)
+    return _DIE_FACES.get(faces, faces)
+
+
+# A unit's stats as used in play: base stats plus the effects of its unlocked
+# evolution tiles. abilities and traits are tuples.
+EffectiveStats = namedtuple('EffectiveStats', 'hp atk def_ mov rng abilities traits')
+
+_STAT_INDEX = {stat: k for k, stat in enumerate(('hp', 'atk', 'def_', 'mov', 'rng'))}
+_NO_BONUS = ((0, 0, 0, 0, 0), (), ())
+
+
+@lru_cache(maxsize=1024)
+def tile_bonus(unit_type, unlocked_mask):
+    """
+    Summed effects of the unlocked tiles of a unit type's tile map:
+    ((hp, atk, def_, mov, rng) deltas, ability IDs, trait IDs).
+    Shared by every unit of the type with the same tiles.
+    """
+    tile_map = get_tile_map(unit_type)
+    if not tile_map:
+        return _NO_BONUS
+    deltas = [0] * len(_STAT_INDEX)
+    abilities = []
+    traits = []
+    for pos in mask_to_tiles(unlocked_mask):
+        effect = tile_map.get(pos)
+        if effect is None:
+            continue
+        if effect.effect_type == 'stat':
+            stat, amount = effect.value
+            deltas[_STAT_INDEX[stat]] += amount
+        elif effect.effect_type == 'ability':
+            abilities.append(effect.value)
+        elif effect.effect_type == 'trait':
+            traits.append(effect.value)
+    return tuple(deltas), tuple(abilities), tuple(traits)
+
+
+def _effective_property(field):
+    def get(self):
+        stats = self._stats
+        if stats is None:
+            stats = self._compute_stats()
+        return stats[field]
+    return property(get, doc=f"Effective {EffectiveStats._fields[field]} (base plus unlocked tiles).")
+
 
 class Unit:
+    # Fixed attribute layout: no per-instance __dict__
+    __slots__ = ('name', 'unit_type', 'level', 'xp', 'base_hp', 'base_atk', 'base_def', 'base_mov', 'base_rng',
+                 'die_faces', 'evolution_position', 'unlocked_mask', 'available_mask',
+                 'base_abilities', 'base_traits', 'current_hp', '_stats')
+
     def __init__(self, name, unit_type):
         # Basic info
         self.name = name                # Display name of the unit
@@ -16,82 +83,105 @@ class Unit:
         self.level = 1                  # Starting level
         self.xp = 0                     # Starting XP
 
-        # Unit type definitions with stats and dice
-        self.unit_definitions = {
-            'Warrior': {
-                'hp': 5, 'atk': 3, 'def_': 2, 'mov': 3, 'rng': 1,
-                'die_faces': ['Sword', 'Sword', 'Shield', 'Shield', 'Pulse', 'Pulse']
-            },
-            'Runeguard': {
-                'hp': 5, 'atk': 3, 'def_': 3, 'mov': 2, 'rng': 1,
-                'die_faces': ['Sword', 'Shield', 'Shield', 'Shield', 'Pulse', 'Pulse']
-            },
-            'Arcane Archer': {
-                'hp': 3, 'atk': 3, 'def_': 2, 'mov': 3, 'rng': 2,
-                'die_faces': ['Sword', 'Sword', 'Sword', 'Shield', 'Pulse', 'Pulse']
-            },
-            'Cleric': {
-                'hp': 5, 'atk': 4, 'def_': 2, 'mov': 3, 'rng': 1,
-                'die_faces': ['Shield', 'Shield', 'Pulse', 'Pulse', 'Pulse', 'Pulse']
-            }
-        }
-
-        # Set stats based on unit type
-        if unit_type in self.unit_definitions:
-            def_stats = self.unit_definitions[unit_type]
-            self.hp = def_stats['hp']
-            self.atk = def_stats['atk']
-            self.def_ = def_stats['def_']
-            self.mov = def_stats['mov']
-            self.rng = def_stats['rng']
-            self.die_faces = def_stats['die_faces']
-        else:
-            # Fallback for unknown unit types
-            self.hp = 5
-            self.atk = 3
-            self.def_ = 2
-            self.mov = 3
-            self.rng = 1
-            self.die_faces = ['Sword', 'Sword', 'Shield', 'Shield', 'Pulse', 'Pulse']
+        # Set base stats based on unit type. Tile effects are not added to
+        # these; hp, atk, def_, mov and rng below are the effective values.
+        base = get_unit_type(unit_type)
+        self.base_hp = base.hp
+        self.base_atk = base.atk
+        self.base_def = base.def_
+        self.base_mov = base.mov
+        self.base_rng = base.rng
+        self.die_faces = base.die_faces  # Shared tuple, never mutated
 
         # Evolution Grid
-        # Grid is 5x5, positions are stored as (row, column), e.g., (2, 2) is center
+        # Grid is 5x5, positions are stored as (row, column), e.g., (2, 2) is center.
+        # Tiles are kept as 25-bit masks (see evolution_grid.py).
         self.evolution_position = (2, 2)           # Start at center of grid
-        self.unlocked_tiles = {(2, 2)}             # Set of all unlocked tiles (start with center)
-        self.available_tiles = set()               # All available tiles based on unit's possition (Not in Chat-GPT)
+        self.unlocked_mask = CENTER_MASK           # All unlocked tiles (start with center)
+        self.available_mask = CENTER_FRONTIER      # Locked tiles next to an unlocked one
 
-        self.abilities = []  # List of ability IDs
-        self.traits = []     # List of passive trait IDs
+        self.base_abilities = []  # List of ability IDs not granted by tiles
+        self.base_traits = []     # List of passive trait IDs not granted by tiles
 
+        self._stats = None         # Cached EffectiveStats, rebuilt when tiles change
         self.current_hp = self.hp  # Track HP during battle
 
+    # --- Effective stats ---
+    hp = _effective_property(0)
+    atk = _effective_property(1)
+    def_ = _effective_property(2)
+    mov = _effective_property(3)
+    rng = _effective_property(4)
+    abilities = _effective_property(5)
+    traits = _effective_property(6)
+
+    @property
+    def stats(self):
+        """EffectiveStats for this unit, computed once per change of tiles."""
+        stats = self._stats
+        if stats is None:
+            stats = self._compute_stats()
+        return stats
+
+    def _compute_stats(self):
+        deltas, abilities, traits = tile_bonus(self.unit_type, self.unlocked_mask)
+        d_hp, d_atk, d_def, d_mov, d_rng = deltas
+        self._stats = EffectiveStats(
+            self.base_hp + d_hp, self.base_atk + d_atk, self.base_def + d_def,
+            self.base_mov + d_mov, self.base_rng + d_rng,
+            tuple(self.base_abilities) + abilities, tuple(self.base_traits) + traits)
+        return self._stats
+
+    def invalidate_stats(self):
+        """Drop the cached effective stats; call after changing base stats or abilities."""
+        self._stats = None
+
     def add_xp(self, amount):
         """Add XP and level up if threshold is reached."""
-        self.xp += amount
-
-        # Simple level-up rule: every 100 XP = +1 level
-        while self.xp >= self.xp_to_next_level():
-            self.xp -= self.xp_to_next_level()
-            self.level += 1
+        # The curve turns total XP into a level with one table lookup,
+        # however many levels the grant is worth
+        self.level, self.xp = XP_CURVE.add_xp(self.level, self.xp, amount)
 
     def xp_to_next_level(self):
         """Returns how much XP is needed for next level."""
-        return 100  # For now, a flat requirement per level
+        return XP_CURVE.xp_to_next(self.level)
 
     def unlock_tile(self, new_pos):
         """Unlock a new evolution tile if it's adjacent to a current one."""
-        if self._is_adjacent(new_pos):
-            self.unlocked_tiles.add(new_pos)
+        if self.available_mask & tile_bit(new_pos):
+            self.unlocked_mask, self.available_mask = grow_frontier(self.unlocked_mask, self.available_mask, new_pos)
             self.evolution_position = new_pos  # Move to the new tile
+            self._stats = None
+
+    def is_unlocked(self, pos):
+        return bool(self.unlocked_mask & tile_bit(pos))
+
+    def can_unlock(self, pos):
+        """True if pos is locked and orthogonally adjacent to an unlocked tile."""
+        return bool(self.available_mask & tile_bit(pos))
+
+    def unlocked_count(self):
+        return count(self.unlocked_mask)
 
-    def _is_adjacent(self, new_pos):
-        """Checks if the new tile is adjacent (orthogonally) to a current unlocked tile."""
-        for tile in self.unlocked_tiles:
-            r, c = tile
-            nr, nc = new_pos
-            if (abs(r - nr) == 1 and c == nc) or (abs(c - nc) == 1 and r == nr):
-                return True
-        return False
+    def set_unlocked_mask(self, mask):
+        """Replace the unlocked tiles and rebuild the frontier."""
+        self.unlocked_mask = mask
+        self.available_mask = frontier(mask)
+        self._stats = None
+
+    @property
+    def unlocked_tiles(self):
+        """Set of unlocked (row, col) tiles (a copy; use unlock_tile to change it)."""
+        return set(mask_to_tiles(self.unlocked_mask))
+
+    @unlocked_tiles.setter
+    def unlocked_tiles(self, tiles):
+        self.set_unlocked_mask(tiles_to_mask(tiles))
+
+    @property
+    def available_tiles(self):
+        """Set of tiles that can be unlocked next."""
+        return set(mask_to_tiles(self.available_mask))
 
     def get_stats(self):
         """Return unit stats as a dictionary (for display)."""
@@ -104,10 +194,6 @@ class Unit:
             "LVL": self.level,
             "XP": self.xp
         }
-    
-    def apply_tile_effect(self, tile_effect):
-        """Apply a TileEffect object to this unit."""
-        tile_effect.apply_to(self)
 
     def is_alive(self):
         return self.current_hp > 0
@@ -118,39 +204,62 @@ class Unit:
             'unit_type': self.unit_type,
             'level': self.level,
             'xp': self.xp,
-            'hp': self.hp,
-            'atk': self.atk,
-            'def_': self.def_,
-            'mov': self.mov,
-            'rng': self.rng,
+            'hp': self.base_hp,
+            'atk': self.base_atk,
+            'def_': self.base_def,
+            'mov': self.base_mov,
+            'rng': self.base_rng,
             'current_hp': self.current_hp,
-            'die_faces': self.die_faces,
+            'die_faces': list(self.die_faces),
             'evolution_position': self.evolution_position,
-            'unlocked_tiles': list(self.unlocked_tiles),
-            'available_tiles': list(self.available_tiles),
-            'abilities': self.abilities,
-            'traits': self.traits
+            'unlocked_tiles': mask_to_tiles(self.unlocked_mask),
+            'available_tiles': mask_to_tiles(self.available_mask),
+            'abilities': list(self.base_abilities),
+            'traits': list(self.base_traits)
         }
 
     @classmethod
-    def from_dict(cls, data):
+    def from_dict(cls, data, effects_applied=False):
+        """
+        :param effects_applied: True for units from a JSON save, which stored
+            stats and abilities with the unlocked tiles' effects added in
+        """
         unit = cls(data['name'], data['unit_type'])
         unit.level = data.get('level', 1)
         unit.xp = data.get('xp', 0)
-        unit.hp = data.get('hp', 10)
-        unit.atk = data.get('atk', 3)
-        unit.def_ = data.get('def_', 2)
-        unit.mov = data.get('mov', 3)
-        unit.rng = data.get('rng', 1)
-        unit.current_hp = data.get('current_hp', unit.hp)
-        unit.die_faces = data.get('die_faces', ['Sword', 'Sword', 'Shield', 'Shield', 'Pulse', 'Pulse'])
+        unit.base_hp = data.get('hp', 10)
+        unit.base_atk = data.get('atk', 3)
+        unit.base_def = data.get('def_', 2)
+        unit.base_mov = data.get('mov', 3)
+        unit.base_rng = data.get('rng', 1)
+        unit.die_faces = shared_die_faces(data.get('die_faces', DEFAULT_DIE_FACES))
         unit.evolution_position = tuple(data.get('evolution_position', (2, 2)))
-        unit.unlocked_tiles = set(tuple(t) for t in data.get('unlocked_tiles', [(2, 2)]))
-        unit.available_tiles = set(tuple(t) for t in data.get('available_tiles', []))
-        unit.abilities = data.get('abilities', [])
-        unit.traits = data.get('traits', [])
+        # available_tiles is derived from the unlocked tiles, not read back
+        unit.set_unlocked_mask(tiles_to_mask(data.get('unlocked_tiles', [(2, 2)])))
+        unit.base_abilities = list(data.get('abilities', []))
+        unit.base_traits = list(data.get('traits', []))
+        if effects_applied:
+            unit._strip_tile_effects()
+        unit.current_hp = data.get('current_hp', unit.hp)
         return unit
 
+    def _strip_tile_effects(self):
+        # JSON saves stored stats and abilities with the unlocked tiles'
+        # effects already added in
+        deltas, abilities, traits = tile_bonus(self.unit_type, self.unlocked_mask)
+        self.base_hp -= deltas[0]
+        self.base_atk -= deltas[1]
+        self.base_def -= deltas[2]
+        self.base_mov -= deltas[3]
+        self.base_rng -= deltas[4]
+        for ability in abilities:
+            if ability in self.base_abilities:
+                self.base_abilities.remove(ability)
+        for trait in traits:
+            if trait in self.base_traits:
+                self.base_traits.remove(trait)
+        self._stats = None
+
 #Create Mock Units Roster
 def create_mock_roster():
     """Returns a list of example units to test with."""
@@ -165,24 +274,68 @@ def create_mock_roster():
 
     return [unit1, unit2, unit3, unit4]
 
-def save_army(units, filename='savegame.json', upgrades=None):
-    data = {
-        'units': [unit.to_dict() for unit in units],
-        'upgrades': upgrades if upgrades is not None else {}
+# Saves are written in the compact binary format; JSON saves from older
+# versions are still read and migrate on the next save.
+SAVE_FILE = 'savegame.sav'
+
+def army_payload(units, upgrades=None, meta=None):
+    """Plain-data form of a save, safe to hand to another thread."""
+    if isinstance(units, LazyRoster):
+        items = list(units.payload_items())  # Undecoded units stay raw
+    else:
+        items = [unit.to_dict() for unit in units]
+    return {
+        'units': items,
+        'upgrades': dict(upgrades) if upgrades is not None else {},
+        'meta': dict(meta) if meta is not None else {}
     }
-    with open(filename, 'w') as f:
-        json.dump(data, f, indent=2)
 
-def load_army(filename='savegame.json'):
+def write_save_data(data, filename=SAVE_FILE):
+    """Atomically replace filename with the binary encoding of data.
+
+    The payload goes to a temporary file that is flushed to disk and then
+    renamed over the old save, so a crash mid-write leaves the previous save
+    intact instead of a truncated file.
+    """
+    blob = encode_save(data['units'], data['upgrades'], data.get('meta'))
+    tmp_name = filename + '.tmp'
+    with open(tmp_name, 'wb') as f:
+        f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_name, filename)
+
+def save_army(units, filename=SAVE_FILE, upgrades=None):
+    write_save_data(army_payload(units, upgrades), filename)
+
+def load_save(filename=SAVE_FILE):
+    """Return (units, upgrades, meta); units is None when there is no save.
+
+    Binary saves come back as a LazyRoster that decodes units on access.
+    If filename does not exist, a JSON save with the same base name is
+    loaded instead so older saves carry over.
+    """
     if not os.path.exists(filename):
-        return None, {}
-    with open(filename, 'r') as f:
-        data = json.load(f)
+        legacy = os.path.splitext(filename)[0] + '.json'
+        if legacy == filename or not os.path.exists(legacy):
+            return None, {}, {}
+        filename = legacy
+    with open(filename, 'rb') as f:
+        raw = f.read()
+    if is_binary_save(raw):
+        roster = LazyRoster(raw, Unit.from_dict)
+        return roster, roster.upgrades, roster.meta
+    data = json.loads(raw.decode('utf-8'))
     # If data is a list, it's the old format
     if isinstance(data, list):
-        units = [Unit.from_dict(u) for u in data]
+        units = [Unit.from_dict(u, effects_applied=True) for u in data]
         upgrades = {}
     else:
-        units = [Unit.from_dict(u) for u in data.get('units', [])]
+        units = [Unit.from_dict(u, effects_applied=True) for u in data.get('units', [])]
         upgrades = data.get('upgrades', {})
+    return units, upgrades, {}
+
+def load_army(filename=SAVE_FILE):
+    """Return (units, upgrades); units is None when there is no save."""
+    units, upgrades, _ = load_save(filename)
     return units, upgrades
@@ -0,0 +1,174 @@
+# xp_curves.py
+# XP needed per level, as pluggable curves.
+#
+# A curve knows the XP cost of each level. It keeps a cumulative table
+# (total XP needed to reach each level), so turning a unit's total XP into a
+# level is one binary search, whatever the size of the grant. Tables grow on
+# demand. The flat curve needs no table; it is a divmod.
+#
+# The game's curve is chosen by the "xp_curve" entry of data/unit_types.json.
+
+from bisect import bisect_right
+from math import isfinite
+
+
+class XPCurve:
+    """Base class: subclasses define cost(level), the XP from level to level + 1."""
+    kind = None
+
+    def __init__(self):
+        self.totals = [0]   # totals[k] = XP needed to go from level 1 to level k + 1
+
+    def cost(self, level):
+        raise NotImplementedError
+
+    def _extend(self, total):
+        # Grow the table until it covers total (doubling, so big grants stay cheap)
+        totals = self.totals
+        while totals[-1] <= total:
+            target = len(totals) * 2
+            while len(totals) < target:
+                totals.append(totals[-1] + self.cost(len(totals)))
+
+    def xp_to_next(self, level):
+        return self.cost(level)
+
+    def total_xp(self, level, xp):
+        """Lifetime XP of a unit at level with xp towards the next one."""
+        if level > len(self.totals):
+            self._extend_levels(level)
+        return self.totals[level - 1] + xp
+
+    def _extend_levels(self, level):
+        while len(self.totals) < level:
+            self.totals.append(self.totals[-1] + self.cost(len(self.totals)))
+
+    def level_for(self, total):
+        """(level, xp towards the next level) for a lifetime XP total."""
+        self._extend(total)
+        level = bisect_right(self.totals, total)
+        return level, total - self.totals[level - 1]
+
+    def add_xp(self, level, xp, amount):
+        """New (level, xp) after gaining amount XP."""
+        return self.level_for(self.total_xp(level, xp) + amount)
+
+    def award(self, units, amount):
+        """
+        Give every unit amount XP (one amount, or one per unit).
+
+        :return: the units that gained at least one level
+        """
+        amounts = amount if isinstance(amount, (list, tuple)) else [amount] * len(units)
+        leveled = []
+        for unit, gain in zip(units, amounts):
+            level, xp = self.add_xp(unit.level, unit.xp, gain)
+            if level != unit.level:
+                leveled.append(unit)
+            unit.level, unit.xp = level, xp
+        return leveled
+
+    def spec(self):
+        """The data-file form of this curve."""
+        raise NotImplementedError
+
+
+class FlatCurve(XPCurve):
+    kind = 'flat'
+
+    def __init__(self, per_level=100):
+        super().__init__()
+        self.per_level = per_level
+
+    def cost(self, level):
+        return self.per_level
+
+    def total_xp(self, level, xp):
+        return (level - 1) * self.per_level + xp
+
+    def level_for(self, total):
+        levels, xp = divmod(total, self.per_level)
+        return levels + 1, xp
+
+    def spec(self):
+        return {'type': self.kind, 'per_level': self.per_level}
+
+
+class LinearCurve(XPCurve):
+    """Level L costs base + step * (L - 1)."""
+    kind = 'linear'
+
+    def __init__(self, base=100, step=25):
+        super().__init__()
+        self.base = base
+        self.step = step
+
+    def cost(self, level):
+        return self.base + self.step * (level - 1)
+
+    def spec(self):
+        return {'type': self.kind, 'base': self.base, 'step': self.step}
+
+
+class ExponentialCurve(XPCurve):
+    """Level L costs round(base * growth ** (L - 1))."""
+    kind = 'exponential'
+
+    def __init__(self, base=100, growth=1.15):
+        super().__init__()
+        self.base = base
+        self.growth = growth
+
+    def cost(self, level):
+        return round(self.base * self.growth ** (level - 1))
+
+    def spec(self):
+        return {'type': self.kind, 'base': self.base, 'growth': self.growth}
+
+
+class TableCurve(XPCurve):
+    """Explicit per-level costs; levels past the table repeat the last cost."""
+    kind = 'table'
+
+    def __init__(self, costs):
+        super().__init__()
+        self.costs = tuple(costs)
+
+    def cost(self, level):
+        return self.costs[min(level, len(self.costs)) - 1]
+
+    def spec(self):
+        return {'type': self.kind, 'costs': list(self.costs)}
+
+
+CURVES = {cls.kind: cls for cls in (FlatCurve, LinearCurve, ExponentialCurve, TableCurve)}
+
+
+def _positive(value, name, integer=True):
+    ok = isinstance(value, int) if integer else isinstance(value, (int, float))
+    if not ok or isinstance(value, bool) or not isfinite(value) or value <= 0:
+        raise ValueError(f"xp_curve: '{name}' must be a positive {'integer' if integer else 'number'}, got {value!r}")
+    return value
+
+
+def make_curve(spec):
+    """Build a curve from its data-file form, e.g. {"type": "linear", "base": 100, "step": 25}."""
+    kind = spec.get('type')
+    if kind not in CURVES:
+        raise ValueError(f"xp_curve: 'type' must be one of {sorted(CURVES)}, got {kind!r}")
+    if kind == 'flat':
+        return FlatCurve(_positive(spec.get('per_level', 100), 'per_level'))
+    if kind == 'linear':
+        step = spec.get('step', 25)
+        if not isinstance(step, int) or isinstance(step, bool) or step < 0:
+            raise ValueError(f"xp_curve: 'step' must be a non-negative integer, got {step!r}")
+        return LinearCurve(_positive(spec.get('base', 100), 'base'), step)
+    if kind == 'exponential':
+        growth = _positive(spec.get('growth', 1.15), 'growth', integer=False)
+        if growth < 1:
+            raise ValueError(f"xp_curve: 'growth' must be at least 1, got {growth!r}")
+        return ExponentialCurve(_positive(spec.get('base', 100), 'base'), growth)
+    costs = spec.get('costs')
+    if not isinstance(costs, list) or not costs:
+        raise ValueError("xp_curve: table curves need a non-empty 'costs' list")
+    return TableCurve([_positive(c, 'costs') for c in costs])